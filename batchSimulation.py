@@ -0,0 +1,144 @@
+"""
+Playing many random games from one board at once with NumPy, every game is a row of arrays and all of them take their
+turns together
+
+Example:
+    python batchSimulation.py --games 100000 --width 8 --height 8 --players 2
+"""
+import argparse
+from time import perf_counter
+import numpy as np
+from boardClass import Board, LOST
+
+
+class BatchSimulation:
+    """
+    Random games played in lockstep: each step, the same player takes a turn in every game that is still running.
+    The boards are the bits of `Board.occupied` as rows of a boolean array, so the cells around each bot are found for
+    every game at once by adding the direction offsets to the bot cells. Games are dropped from the arrays as soon as
+    they are won, so later steps only work on the games left.
+    """
+
+    def __init__(self, board: Board, player: int, games: int, seed: int | None = None) -> None:
+        """
+        :param board: the board every game starts from, it is not changed
+        :param player: the player who takes the first turn
+        :param games: how many games to play
+        """
+        if games <= 0:
+            raise ValueError('The number of games must be positive')
+        self.num_players = len(board.players)
+        self.player = player
+        self.random = np.random.default_rng(seed)
+        self.size = board.size
+        self.offsets = np.array(board.direction_offsets)
+
+        occupied = np.array([board.occupied >> index & 1 for index in range(board.size)], dtype=bool)
+        self.occupied = np.tile(occupied, (games, 1))  # the occupied cells of each game
+        self.positions = np.tile(np.array(board.players), (games, 1))  # the cell of each player in each game
+        self.games = np.arange(games)  # the number of each game that is still running
+        self.left = np.full(games, board.players_left)  # how many players are left in each game
+        self.winners = np.full(games, LOST)  # the winner of each game, `LOST` until it is won
+        self.turns = 0  # the turns taken in all games
+        self.drop_finished()
+
+    @property
+    def running(self) -> int:
+        return len(self.games)
+
+    def choose(self, free: np.ndarray) -> np.ndarray:
+        """Returns a random free direction for each row of a (games, 4) mask, every row must have one."""
+        return np.argmax(np.where(free, self.random.random(free.shape), -1.), axis=1)
+
+    def step(self) -> None:
+        """The player whose turn it is takes a random turn in every game, or loses if they cannot move."""
+        player = self.player
+        self.player = (player + 1) % self.num_players
+        cells = self.positions[:, player]
+        playing = np.flatnonzero(cells != LOST)
+        if not len(playing):
+            return
+        cells = cells[playing]
+        rows = playing * self.size  # the index of each game's first cell in the flattened boards
+        occupied = self.occupied.reshape(-1)
+
+        moves = ~occupied[(rows + cells)[:, None] + self.offsets]
+        stuck = ~moves.any(axis=1)
+        if stuck.any():
+            # the bot stays on its cell as a tile
+            self.positions[playing[stuck], player] = LOST
+            self.left[playing[stuck]] -= 1
+            moving = ~stuck
+            playing, cells, rows, moves = playing[moving], cells[moving], rows[moving], moves[moving]
+
+        new_cells = cells + self.offsets[self.choose(moves)]
+        occupied[rows + cells] = False
+        occupied[rows + new_cells] = True
+        # the cell the bot left is free, so there is always somewhere to place a tile
+        placements = ~occupied[(rows + new_cells)[:, None] + self.offsets]
+        occupied[rows + new_cells + self.offsets[self.choose(placements)]] = True
+        self.positions[playing, player] = new_cells
+        self.turns += len(playing)
+        self.drop_finished()
+
+    def drop_finished(self) -> None:
+        """Records the winners of the games with one player left and removes those games from the arrays."""
+        finished = self.left <= 1
+        if not finished.any():
+            return
+        positions = self.positions[finished]
+        alive = positions != LOST
+        self.winners[self.games[finished]] = np.where(alive.any(axis=1), np.argmax(alive, axis=1), LOST)
+        running = ~finished
+        self.occupied = self.occupied[running]
+        self.positions = self.positions[running]
+        self.games = self.games[running]
+        self.left = self.left[running]
+
+    def run(self) -> np.ndarray:
+        """
+        Plays every game until it is won.
+
+        :return: the winner of each game
+        """
+        while self.running:
+            self.step()
+        return self.winners
+
+
+def wins(board: Board, player: int, games: int, seed: int | None = None) -> list[int]:
+    """
+    Plays random games from the board, the player taking the first turn.
+
+    :return: how many games each player won
+    """
+    winners = BatchSimulation(board, player, games, seed).run()
+    return np.bincount(winners[winners != LOST], minlength=len(board.players)).tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measures how many random games can be played each second.')
+    parser.add_argument('--games', type=int, default=100_000, help='how many games to play at once')
+    parser.add_argument('--width', type=int, default=8, help='the width of the board')
+    parser.add_argument('--height', type=int, default=8, help='the height of the board')
+    parser.add_argument('--players', type=int, default=2, help='the number of players')
+    parser.add_argument('--seed', type=int, default=0, help='the seed for the random turns')
+    args = parser.parse_args()
+
+    board = Board(args.width, args.height)
+    try:
+        for _ in range(args.players):
+            board.add_player(board.start_position())
+        simulation = BatchSimulation(board, 0, args.games, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    start = perf_counter()
+    winners = simulation.run()
+    seconds = perf_counter() - start
+    counts = np.bincount(winners[winners != LOST], minlength=args.players)
+    print(f'{args.games} games, {simulation.turns} turns in {seconds:.2f}s, {args.games / seconds:.0f} games/s')
+    print('wins: ' + ', '.join(f'player {player + 1}: {count}' for player, count in enumerate(counts)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+A class for the state of a board, with the occupied cells packed into the bits of an integer
+"""
+import struct
+from typing import Iterator
+
+
+LOST = -1  # the cell of a player who has lost
+HEADER = struct.Struct('<HHB')  # the width, height, and number of players of a board stored as bytes
+# the offsets of the directions a bot can move or place a tile in, the direction is the index of the offset
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+def encode_action(move_direction: int, tile_direction: int) -> int:
+    """A turn, moving and then placing a tile, as a number from 0 to 15."""
+    return move_direction << 2 | tile_direction
+
+
+def decode_action(action: int) -> tuple[int, int]:
+    """Returns the direction the bot moves in and the direction the tile is placed in."""
+    return action >> 2, action & 3
+
+
+class Board:
+    """
+    The board that the bots move on and place tiles on. Every cell is a bit of `occupied`, which is set if there is a
+    tile or a bot on the cell. The board is surrounded by cells which are always occupied, so moving off of the board
+    is the same as moving onto an occupied cell, and checking a cell never needs a bounds check.
+
+    Cells are numbered row by row, with one border column between rows (it is on the right of one row and the left of
+    the next) and a border row above and below the board:
+        index = (y + 1) * stride + x + 1, where stride = width + 1
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        """
+        :param width: width of board
+        :param height: height of board
+        """
+        if width < 1 or height < 1:
+            raise ValueError('The width and height of the board must be positive')
+        self.width = width
+        self.height = height
+        self.stride = width + 1
+        self.size = (height + 2) * self.stride + 1  # the number of cells including the border
+
+        # how far the index of a cell changes when moving in each direction
+        self.direction_offsets = (1, self.stride, -1, -self.stride)
+
+        # a mask of the cells on the board, everything else is border
+        row = ((1 << width) - 1) << 1
+        self.board_mask = sum(row << (y * self.stride) for y in range(1, height + 1))
+
+        self.occupied = ((1 << self.size) - 1) & ~self.board_mask  # the border, tiles, and bots
+        self.tiles = 0  # the tiles, including the tiles left where bots lost
+        self.players: list[int] = []  # the cell of each player's bot, `LOST` if the player lost
+
+    def copy(self) -> 'Board':
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.players = self.players[:]
+        return board
+
+    def to_bytes(self) -> bytes:
+        """
+        Stores the board compactly, for example to send it to another process: the header, the cell of each player,
+        then the tiles and the cells with bots on them as bits.
+        """
+        num_bytes = (self.size + 7) // 8
+        return HEADER.pack(self.width, self.height, len(self.players)) + \
+            struct.pack(f'<{len(self.players)}i', *self.players) + \
+            self.tiles.to_bytes(num_bytes, 'little') + (self.occupied & self.board_mask).to_bytes(num_bytes, 'little')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Board':
+        """Creates a board stored with `to_bytes`."""
+        width, height, num_players = HEADER.unpack_from(data)
+        board = cls(width, height)
+        offset = HEADER.size
+        board.players = list(struct.unpack_from(f'<{num_players}i', data, offset))
+        offset += 4 * num_players
+        num_bytes = (board.size + 7) // 8
+        board.tiles = int.from_bytes(data[offset:offset + num_bytes], 'little')
+        board.occupied |= int.from_bytes(data[offset + num_bytes:offset + 2 * num_bytes], 'little')
+        return board
+
+    # converting between positions and cells
+    def index(self, pos) -> int:
+        """Returns the cell at a position (x, y), which does not need to be on the board."""
+        x, y = pos
+        return (y + 1) * self.stride + x + 1
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Returns the position (x, y) of a cell."""
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def direction(self, offset) -> int:
+        """Returns the direction of an offset such as (1, 0)."""
+        return DIRECTIONS.index(tuple(offset))
+
+    # checking cells
+    def in_bounds(self, pos) -> bool:
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, pos) -> bool:
+        """Whether a position is on the board and has no tile or bot on it."""
+        return self.in_bounds(pos) and not self.occupied >> self.index(pos) & 1
+
+    def free_directions(self, index: int) -> int:
+        """
+        Returns the directions which are free around a cell as a 4 bit mask, bit `d` is set if the cell in direction
+        `d` is free.
+        """
+        stride = self.stride
+        around = ~self.occupied >> (index - stride)  # the cell above is bit 0 and the cell below is bit 2 * stride
+        return (around >> (stride + 1) & 1) | (around >> (2 * stride) & 1) << 1 | \
+            (around >> (stride - 1) & 1) << 2 | (around & 1) << 3
+
+    # the players
+    def add_player(self, pos) -> int:
+        """Places a new player's bot at a position, returning the number of the player."""
+        if not self.is_free(pos):
+            raise ValueError(f'The position {tuple(pos)} is not free')
+        index = self.index(pos)
+        self.occupied |= 1 << index
+        self.players.append(index)
+        return len(self.players) - 1
+
+    def start_position(self) -> tuple[int, int]:
+        """
+        Returns a position for a new bot, which is the free cell furthest from the other bots, preferring cells closer
+        to the center of the board.
+        """
+        others = [self.position(index) for index in self.players if index != LOST]
+        center = (self.width - 1) / 2, (self.height - 1) / 2
+
+        def score(pos: tuple[int, int]) -> tuple[float, float]:
+            distance = min((abs(pos[0] - x) + abs(pos[1] - y) for x, y in others), default=0)
+            return distance, -abs(pos[0] - center[0]) - abs(pos[1] - center[1])
+
+        return max(((x, y) for y in range(self.height) for x in range(self.width) if self.is_free((x, y))), key=score)
+
+    def player_position(self, player: int) -> tuple[int, int]:
+        """Returns the position of a player's bot, (-1, -1) if the player lost."""
+        index = self.players[player]
+        return (-1, -1) if index == LOST else self.position(index)
+
+    @property
+    def player_positions(self) -> list[tuple[int, int]]:
+        return [self.player_position(player) for player in range(len(self.players))]
+
+    def has_lost(self, player: int) -> bool:
+        return self.players[player] == LOST
+
+    def legal_moves(self, player: int) -> int:
+        """Returns the directions the player's bot can move in as a 4 bit mask."""
+        return self.free_directions(self.players[player])
+
+    def can_move(self, player: int, offset) -> bool:
+        """Whether the player's bot can move by the offset, such as (1, 0)."""
+        return bool(self.legal_moves(player) >> self.direction(offset) & 1)
+
+    def is_stuck(self, player: int) -> bool:
+        """Whether the player's bot has nowhere to move."""
+        return not self.legal_moves(player)
+
+    def move_player(self, player: int, direction: int) -> None:
+        """Moves the player's bot one cell in a direction, the cell must be free."""
+        index = self.players[player]
+        new_index = index + self.direction_offsets[direction]
+        self.occupied ^= 1 << index | 1 << new_index
+        self.players[player] = new_index
+
+    def next_player(self, player: int) -> int:
+        """Returns the player whose turn is after the player's, skipping players who lost."""
+        for i in range(1, len(self.players) + 1):
+            next_player = (player + i) % len(self.players)
+            if self.players[next_player] != LOST:
+                return next_player
+        return player
+
+    @property
+    def players_left(self) -> int:
+        return len(self.players) - self.players.count(LOST)
+
+    def remove_player(self, player: int) -> None:
+        """The player lost, their bot is replaced with a tile."""
+        self.tiles |= 1 << self.players[player]
+        self.players[player] = LOST
+
+    # turns
+    def actions(self, player: int) -> list[int]:
+        """
+        Returns every turn the player can take without losing, moving and then placing a tile, encoded with
+        `encode_action`. If there are none, the player loses this turn.
+        """
+        index = self.players[player]
+        actions = []
+        moves = self.free_directions(index)
+        for move_direction in range(4):
+            if not moves >> move_direction & 1:
+                continue
+            new_index = index + self.direction_offsets[move_direction]
+            # the cell the bot left is free once it has moved, so a tile can be placed there
+            stride = self.stride
+            around = ~(self.occupied ^ (1 << index | 1 << new_index)) >> (new_index - stride)
+            placements = (around >> (stride + 1) & 1) | (around >> (2 * stride) & 1) << 1 | \
+                (around >> (stride - 1) & 1) << 2 | (around & 1) << 3
+            actions.extend(move_direction << 2 | tile_direction for tile_direction in range(4)
+                           if placements >> tile_direction & 1)
+        return actions
+
+    def play(self, player: int, action: int) -> None:
+        """The player takes a turn encoded with `encode_action`, the turn must be legal."""
+        move_direction, tile_direction = decode_action(action)
+        self.move_player(player, move_direction)
+        self.place_tile(player, tile_direction)
+
+    # tiles
+    def legal_placements(self, player: int) -> int:
+        """Returns the directions the player can place a tile in around their bot as a 4 bit mask."""
+        return self.free_directions(self.players[player])
+
+    def place_tile(self, player: int, direction: int) -> None:
+        """Places a tile next to the player's bot in a direction, the cell must be free."""
+        bit = 1 << self.players[player] + self.direction_offsets[direction]
+        self.occupied |= bit
+        self.tiles |= bit
+
+    def add_tile(self, pos) -> bool:
+        """Places a tile at a position if it is free, returning whether it was placed."""
+        if not self.is_free(pos):
+            return False
+        bit = 1 << self.index(pos)
+        self.occupied |= bit
+        self.tiles |= bit
+        return True
+
+    def is_tile(self, pos) -> bool:
+        return self.in_bounds(pos) and bool(self.tiles >> self.index(pos) & 1)
+
+    @property
+    def tile_positions(self) -> Iterator[tuple[int, int]]:
+        tiles = self.tiles
+        while tiles:
+            lowest = tiles & -tiles
+            yield self.position(lowest.bit_length() - 1)
+            tiles ^= lowest
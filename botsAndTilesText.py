@@ -1,47 +1,156 @@
-from os import name, system
-from typing import Any
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from os import name, path, system
+from typing import Any, Callable, TextIO
+from boardClass import Board, DIRECTIONS, decode_action, encode_action
+from endgameSolver import EndgameSolver
+from openingBook import OpeningBook
+from mctsBotClass import MCTSBot
+from parallelSearch import ParallelMCTSBot, ParallelSearchBot
+from searchBotClass import SearchBot
+from terminalRenderer import TerminalRenderer
 
 
-EMPTY_TILE = '-'
 ORTHOGONAL_MOVEMENTS = {
     'd': (0, 1),
     'u': (0, -1),
     'l': (-1, 0),
     'r': (1, 0)
 }
-FILLED_TILE = 'X'
+DIRECTION_OF_MOVEMENT = {movement: DIRECTIONS.index(movement) for movement in ORTHOGONAL_MOVEMENTS.values()}
+IDENTIFIER_OF_DIRECTION = {direction: identifier for identifier, direction in
+                           zip(ORTHOGONAL_MOVEMENTS, DIRECTION_OF_MOVEMENT.values())}
+BOT_THINKING_TIME = .5  # how many seconds each bot can think for each turn
+MCTS_PLAYERS = 3  # games with at least this many players use Monte Carlo tree search bots instead of alpha-beta
+BOT_WORKERS = 1  # how many processes each bot searches with, more than 1 spreads the search across cores
+ENDGAME_TABLE = None  # the file the solved endgames are kept in between games, None to not keep them
+OPENING_BOOK = 'openings.book'  # the opening book the bots play from if the file exists (see `openingBook.py`)
+BOARD_CELL_SIZE = 0  # how many characters wide each cell is drawn, 0 for one character without borders
+RENDER_BOARD = True  # whether to draw the board, False for games without a display
+
+Validator = Callable[[Any], str | None]  # returns why an answer is invalid, None if it is valid
+
+
+class InvalidAnswer(ValueError):
+    """An answer read from a script which cannot be used, with the details needed to report it."""
+
+    def __init__(self, reason: str, text: str, line: int, player: int | None = None,
+                 expected: list[str] | None = None) -> None:
+        """
+        :param reason: why the answer cannot be used
+        :param text: the line that was read
+        :param line: the number of the line, counted from 1
+        :param player: the player who was answering, counted from 1
+        :param expected: the answers that could have been given
+        """
+        super().__init__(f'line {line}: {reason}')
+        self.reason = reason
+        self.text = text
+        self.line = line
+        self.player = player
+        self.expected = expected
+
+    def to_dict(self) -> dict:
+        return {'error': self.reason, 'line': self.line, 'input': self.text, 'player': self.player,
+                'expected': self.expected}
+
+
+def at_least(minimum: int | float) -> Validator:
+    return lambda answer: None if answer >= minimum else f'The answer must be at least {minimum}'
+
+
+def between(low: int, high: int) -> Validator:
+    """Accepts answers from `low` to `high`, including both."""
+    return lambda answer: None if low <= answer <= high else f'The answer must be from {low} to {high}'
+
+
+def one_of(options: set[str]) -> Validator:
+    return lambda answer: None if answer in options else f'The answer must be one of {"/".join(sorted(options))}'
 
 
 def main() -> None:
-    num_players = verified_input('How many players will be playing?\n>>>', int, 'the_input >= 0')
-    num_bots = verified_input('How many bots will be playing too?\n>>>', int,
-                              f'the_input >= {max(2 - num_players, 0)}')
-    width = verified_input('What should be the width of the board?\n>>>', int, 'the_input >= 2')
-    height = verified_input('What should be the height of the board?\n>>>', int,
-                            f'the_input >= {max((num_players + num_bots) / width, 2)}')
-    game(width, height, num_players, num_bots)
+    parser = argparse.ArgumentParser(description='Plays Bots and Tiles in the console.')
+    parser.add_argument('--script', metavar='PATH',
+                        help="reads the players' turns from a file, - for the standard input, instead of asking")
+    parser.add_argument('--players', type=int, default=2, help='the number of players in a scripted game')
+    parser.add_argument('--bots', type=int, default=0, help='the number of bots in a scripted game')
+    parser.add_argument('--width', type=int, default=8, help='the width of the board in a scripted game')
+    parser.add_argument('--height', type=int, default=8, help='the height of the board in a scripted game')
+    parser.add_argument('--render', action='store_true', help='draws the board in a scripted game')
+    parser.add_argument('--endgame-table', metavar='PATH', default=ENDGAME_TABLE,
+                        help='keeps the endgames the bots solve in this file, so that later games reuse them')
+    args = parser.parse_args()
+
+    if args.script is None:
+        num_players = verified_input('How many players will be playing?\n>>>', int, at_least(0))
+        num_bots = verified_input('How many bots will be playing too?\n>>>', int, at_least(max(2 - num_players, 0)))
+        width = verified_input('What should be the width of the board?\n>>>', int, at_least(2))
+        height = verified_input('What should be the height of the board?\n>>>', int,
+                                at_least(max((num_players + num_bots) / width, 2)))
+        game(width, height, num_players, num_bots, endgame_table=args.endgame_table)
+        return
+
+    # checked in order, since the smallest height is only known once the width is known to be at least 2
+    checks = (
+        lambda: at_least(0)(args.players),
+        lambda: at_least(max(2 - args.players, 0))(args.bots),
+        lambda: at_least(2)(args.width),
+        lambda: at_least(max((args.players + args.bots) / args.width, 2))(args.height),
+    )
+    for check in checks:
+        if (message := check()) is not None:
+            parser.error(message)
+    stream = sys.stdin if args.script == '-' else open(args.script)
+    try:
+        game(args.width, args.height, args.players, args.bots, ScriptedInput(stream), args.render, args.endgame_table)
+    except InvalidAnswer as e:
+        print(json.dumps(e.to_dict()), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
 
 
-def game(width: int, height: int, num_players: int, num_bots: int) -> None:
+def game(width: int, height: int, num_players: int, num_bots: int,
+         answers: 'InteractiveInput | ScriptedInput | None' = None, render: bool = RENDER_BOARD,
+         endgame_table: str | None = ENDGAME_TABLE) -> None:
     """
     :param width: width of board
     :param height: height of board
     :param num_players: number of players
     :param num_bots: number of bots
+    :param answers: where the players' placements and turns come from, asking the players if None
+    :param render: whether to draw the board
+    :param endgame_table: the file the bots keep the endgames they solve in, None to only keep them during the game
     """
+    if answers is None:
+        answers = InteractiveInput()
     players_playing = list(range(num_players + num_bots))
-    player_locs: list[tuple[int, int]] = []  # a dictionary for the location of the players, player: location
-    placed_tiles: set[tuple[int, int]] = set()  # a set of all tiles placed by the players
+    board = Board(width, height)  # the locations of the players and all tiles placed by the players
+    executor = ProcessPoolExecutor(BOT_WORKERS) if BOT_WORKERS > 1 and num_bots else None  # shared by the bots
+    endgame = EndgameSolver(endgame_table if num_bots else None)  # shared by the bots
+    book = OpeningBook(OPENING_BOOK) if num_bots and path.exists(OPENING_BOOK) else None  # shared by the bots
+    renderer = TerminalRenderer(BOARD_CELL_SIZE, render)
+    if executor is not None:
+        bot_class = ParallelMCTSBot if num_players + num_bots >= MCTS_PLAYERS else ParallelSearchBot
+        bots = {bot: bot_class(BOT_THINKING_TIME, workers=BOT_WORKERS, executor=executor, endgame=endgame,
+                                book=book)
+                for bot in range(num_players, num_players + num_bots)}
+    else:
+        bot_class = MCTSBot if num_players + num_bots >= MCTS_PLAYERS else SearchBot
+        bots = {bot: bot_class(BOT_THINKING_TIME, endgame=endgame, book=book)
+                for bot in range(num_players, num_players + num_bots)}
     game_running = True
     while game_running:  # one game
         to_remove = set()
-        print(players_playing)
         for i in players_playing:  # one round
             if i < num_players:
-                player_turn(i, width, height, player_locs, placed_tiles)
+                player_turn(i, board, renderer, answers)
             else:
-                bot_turn(i, width, height, player_locs, placed_tiles)
-            if player_locs[i] == (-1, -1):
+                bot_turn(i, board, bots[i], renderer, num_players + num_bots)
+            if board.has_lost(i):
                 to_remove.add(i)
             if len(players_playing) - len(to_remove) == 1:
                 for player in to_remove:
@@ -52,111 +161,188 @@ def game(width: int, height: int, num_players: int, num_bots: int) -> None:
                 break
         for player in to_remove:
             players_playing.remove(player)
+    if executor is not None:
+        executor.shutdown()
+    endgame.close()
+    if book is not None:
+        book.close()
+    renderer.close()
 
 
-def player_turn(player: int, width: int, height: int, player_locs: list[tuple[int, int]],
-                placed_tiles: set[tuple[int, int]]) -> None:
-    print_board(width, height, player_locs, placed_tiles)
-    if len(player_locs) <= player:  # first turn
-        print(f'Where would you, player {player + 1}, like to place your bot? ' +
-              '(Your position cannot be the same as any of the other players: ' +
-              f'{"; ".join([str((pos[0] + 1, pos[1] + 1)) for pos in player_locs])})')
-        while True:
-            x_pos = verified_input('\tPlease enter the x position:\n\t>>>', int, f'0 < the_input < {width + 1}')
-            y_pos = verified_input('\tPlease enter the y position:\n\t>>>', int, f'0 < the_input < {height + 1}')
-            pos = x_pos - 1, y_pos - 1
-            if pos not in player_locs:
-                player_locs.append(pos)
-                break
-            print('Sorry, your position was already taken by another player')
-        print_board(width, height, player_locs, placed_tiles)
+def player_turn(player: int, board: Board, renderer: TerminalRenderer,
+                answers: 'InteractiveInput | ScriptedInput') -> None:
+    """
+    :param player: the number of the player
+    :param renderer: draws the board after each part of the turn
+    :param answers: where the player's placement and turns come from
+    """
+    renderer.draw(board)
+    if len(board.players) <= player:  # first turn
+        board.add_player(answers.placement(board, player))
+        renderer.draw(board)
         return
-    player_pos = player_locs[player]
 
     # the player moving:
-    possible_moves = set()
-    for kvp in ORTHOGONAL_MOVEMENTS.items():
-        identifier, ortho_movement = kvp
-        adj_pos = change_position(player_pos, ortho_movement)
-        if width > adj_pos[0] >= 0 and height > adj_pos[1] >= 0 and \
-                adj_pos not in player_locs and adj_pos not in placed_tiles:
-            possible_moves.add(identifier)
-    if len(possible_moves) == 0:
-        placed_tiles.add(player_locs[player])
-        player_locs[player] = (-1, -1)
+    if not board.legal_moves(player):
+        board.remove_player(player)
+        return
+    board.move_player(player, answers.move(board, player))
+    renderer.draw(board)
+
+    # the player placing a tile, the cell the bot left is always free
+    board.place_tile(player, answers.tile(board, player))
+    renderer.draw(board)
+
+
+def bot_turn(bot: int, board: Board, search_bot: SearchBot | MCTSBot | ParallelSearchBot | ParallelMCTSBot,
+             renderer: TerminalRenderer, num_players: int) -> None:
+    """
+    :param bot: the number of the bot's player
+    :param search_bot: chooses the bot's turns
+    :param renderer: draws the board after the turn
+    :param num_players: how many players and bots the game has
+    """
+    if len(board.players) <= bot:  # first turn
+        pos = search_bot.choose_start(board, num_players)
+        board.add_player(pos)
+        print(f'Bot {bot + 1} placed its bot at {(pos[0] + 1, pos[1] + 1)}')
+        renderer.draw(board)
         return
 
-    move_dir = verified_input(f'Where would you like to move your bot, player {player + 1}? ' +
-                              f'({"/".join(possible_moves)})\n>>>', str, f'the_input in {possible_moves}')
-    player_pos = player_locs[player] = change_position(player_locs[player], ORTHOGONAL_MOVEMENTS[move_dir])
-    print_board(width, height, player_locs, placed_tiles)
-
-    # the player placing a tile:
-    possible_tile_placements = set()
-    for kvp in ORTHOGONAL_MOVEMENTS.items():
-        identifier, ortho_movement = kvp
-        adj_pos = change_position(player_pos, ortho_movement)
-        if width > adj_pos[0] >= 0 and height > adj_pos[1] >= 0 and \
-                adj_pos not in player_locs and adj_pos not in placed_tiles:
-            possible_tile_placements.add(identifier)
-    if len(possible_tile_placements) == 0:
-        placed_tiles.add(player_locs[player])
-        player_locs[player] = (-1, -1)
+    action = search_bot.choose_action(board, bot)
+    if action is None:  # the bot has nowhere to move
+        board.remove_player(bot)
+        print(f'Bot {bot + 1} has nowhere left to go')
+        renderer.draw(board)
         return
 
-    move_dir = verified_input(f"Where would you like to place a tile? ({'/'.join(possible_tile_placements)})\n>>>", str,
-                              f'the_input in {possible_tile_placements}')
-    placed_tiles.add(change_position(player_locs[player], ORTHOGONAL_MOVEMENTS[move_dir]))
-    print_board(width, height, player_locs, placed_tiles)
-    return
+    move_dir, tile_dir = decode_action(action)
+    board.play(bot, action)
+    print(f'Bot {bot + 1} moved {IDENTIFIER_OF_DIRECTION[move_dir]} and placed a tile ' +
+          f'{IDENTIFIER_OF_DIRECTION[tile_dir]} ({search_bot.summary()})')
+    renderer.draw(board)
+
+
+def free_identifiers(directions: int) -> set[str]:
+    """Returns the identifiers (d, u, l, r) of the directions set in a 4 bit mask of directions."""
+    return {identifier for identifier, movement in ORTHOGONAL_MOVEMENTS.items()
+            if directions >> DIRECTION_OF_MOVEMENT[movement] & 1}
+
+
+def print_board(board: Board, size: int = 0) -> None:
+    """
+    Prints the whole board to the console, games use a `TerminalRenderer` which only writes the cells that changed
+
+    :param size: how large one cell of the board is, 0 for one character
+    :param board: the locations of the players and the tiles placed by them
+    """
+    TerminalRenderer(size, ansi=False).draw(board)
 
 
-def bot_turn(bot:int, width: int, height: int, player_locs: list[tuple[int, int]],
-             placed_tiles: set[tuple[int, int]]):
-    pass
+class InteractiveInput:
+    """Asks the players for their placements and turns, asking again until the answer can be used."""
 
+    def placement(self, board: Board, player: int) -> tuple[int, int]:
+        print(f'Where would you, player {player + 1}, like to place your bot? ' +
+              '(Your position cannot be the same as any of the other players: ' +
+              f'{"; ".join([str((pos[0] + 1, pos[1] + 1)) for pos in board.player_positions])})')
+        x_range, y_range = between(1, board.width), between(1, board.height)
+        while True:
+            x_pos = verified_input('\tPlease enter the x position:\n\t>>>', int, x_range)
+            y_pos = verified_input('\tPlease enter the y position:\n\t>>>', int, y_range)
+            pos = x_pos - 1, y_pos - 1
+            if board.is_free(pos):
+                return pos
+            print('Sorry, your position was already taken by another player')
 
-def change_position(pos: tuple[int, int], change: tuple[int, int]):
-    return pos[0] + change[0], pos[1] + change[1]
+    def move(self, board: Board, player: int) -> int:
+        """Returns the direction the player moves their bot in, the player must be able to move."""
+        possible_moves = free_identifiers(board.legal_moves(player))
+        move_dir = verified_input(f'Where would you like to move your bot, player {player + 1}? ' +
+                                  f'({"/".join(possible_moves)})\n>>>', str, one_of(possible_moves))
+        return DIRECTION_OF_MOVEMENT[ORTHOGONAL_MOVEMENTS[move_dir]]
 
+    def tile(self, board: Board, player: int) -> int:
+        """Returns the direction the player places a tile in, after their bot moved."""
+        possible_tile_placements = free_identifiers(board.legal_placements(player))
+        tile_dir = verified_input(f"Where would you like to place a tile? ({'/'.join(possible_tile_placements)})\n>>>",
+                                  str, one_of(possible_tile_placements))
+        return DIRECTION_OF_MOVEMENT[ORTHOGONAL_MOVEMENTS[tile_dir]]
 
-def print_board(width: int, height: int, player_locs: list[tuple[int, int]], placed_tiles: set[tuple[int, int]],
-                size: int = 0) -> None:
+
+class ScriptedInput:
     """
-    Prints the board to the console
+    Reads the players' placements and turns from a stream, one line for each, so that the game can be played by a file
+    or another program. Empty lines and lines starting with # are skipped.
+        a placement is the x and y position counted from 1: 3 4
+        a turn is the direction to move in and then the direction to place a tile in, out of d/u/l/r: r u
+    Players who cannot move lose without a line being read.
 
-    :param size: how large one cell of the board is
-    :param width: width of board
-    :param height: height of board
-    :param player_locs: the locations of the players (x, y)
-    :param placed_tiles: locations where tiles were placed (x, y)
+    Invalid lines are reported as JSON, with the reason, the line, and the answers that could have been given, and the
+    next line is read instead. If `strict`, the first invalid line raises `InvalidAnswer` instead.
     """
-    if size < 0 or not isinstance(size, int):
-        raise ValueError('The size of a cell must be a natural number or zero')
-    board = [
-        [
-            (
-                str(player_locs.index((x, y)) + 1) if ((x, y) in player_locs) else
-                (FILLED_TILE if (x, y) in placed_tiles else EMPTY_TILE)
-            ) for x in range(width)
-        ] for y in range(height)
-    ]
-    if size == 0:
-        print(''.join([''.join(line) + '\n' for line in board]))
-    # TODO: create a system for any size of cell
-    # start_and_end_lines = f'+{"-" * size}+\n'
-    # middle_lines = f'|{" " * size}|\n'
-    # size //= 2
-    # if size == 0:
-    #     size = 1
-    # i = size
-    # start_cell = start_and_end_lines + middle_lines * size + start_and_end_lines
-    # horizontal_cells = start_and_end_lines[1:] + middle_lines[1:] * size + start_and_end_lines[1:]
-    # vertical_cells = middle_lines * size + start_and_end_lines
-    # diagonal_cells = middle_lines[1:] * size + start_and_end_lines[1:]
-    # for i, row in enumerate(board):
-    #     for j, cell in enumerate(row):
-    #         pass
+
+    def __init__(self, stream: TextIO, errors: TextIO | None = None, strict: bool = False) -> None:
+        """
+        :param stream: where the lines are read from
+        :param errors: where invalid lines are reported, the standard error if None
+        """
+        self.stream = stream
+        self.errors = errors if errors is not None else sys.stderr
+        self.strict = strict
+        self.line_number = 0
+        self.invalid = 0  # how many invalid lines were read
+        self.__tile_dir = 0  # the tile direction of the turn being played
+
+    def read(self) -> str:
+        """Returns the next line which is not empty or a comment."""
+        for line in self.stream:
+            self.line_number += 1
+            line = line.strip()
+            if line and not line.startswith('#'):
+                return line
+        raise InvalidAnswer('the script ended before the game did', '', self.line_number + 1)
+
+    def report(self, error: InvalidAnswer) -> None:
+        if self.strict:
+            raise error
+        self.invalid += 1
+        print(json.dumps(error.to_dict()), file=self.errors)
+
+    def placement(self, board: Board, player: int) -> tuple[int, int]:
+        while True:
+            text = self.read()
+            try:
+                x_pos, y_pos = (int(part) for part in text.split())
+            except ValueError:
+                self.report(InvalidAnswer('a placement must be two whole numbers', text, self.line_number, player + 1))
+                continue
+            pos = x_pos - 1, y_pos - 1
+            if board.is_free(pos):
+                return pos
+            reason = 'the position is taken' if board.in_bounds(pos) else 'the position is not on the board'
+            self.report(InvalidAnswer(reason, text, self.line_number, player + 1))
+
+    def move(self, board: Board, player: int) -> int:
+        """Reads the whole turn, returning the move and keeping the tile direction for `tile`."""
+        actions = board.actions(player)
+        while True:
+            text = self.read()
+            parts = text.split()
+            if len(parts) == 2 and all(part in ORTHOGONAL_MOVEMENTS for part in parts):
+                move_dir, tile_dir = (DIRECTION_OF_MOVEMENT[ORTHOGONAL_MOVEMENTS[part]] for part in parts)
+                if encode_action(move_dir, tile_dir) in actions:
+                    self.__tile_dir = tile_dir
+                    return move_dir
+                reason = 'the turn cannot be taken'
+            else:
+                reason = 'a turn must be two directions out of d/u/l/r'
+            expected = [f'{IDENTIFIER_OF_DIRECTION[action >> 2]} {IDENTIFIER_OF_DIRECTION[action & 3]}'
+                        for action in actions]
+            self.report(InvalidAnswer(reason, text, self.line_number, player + 1, expected))
+
+    def tile(self, board: Board, player: int) -> int:
+        return self.__tile_dir
 
 
 def clear_terminal() -> None:
@@ -171,24 +357,27 @@ def clear_terminal() -> None:
         system('clear')
 
 
-def verified_input(prompt: str, target_type: type, *criterias: str) -> Any:
+def verified_input(prompt: str, target_type: type, *validators: Validator) -> Any:
     """
-    Prompts the user and verifies that the response can be turned into the target type and passes the criteria.
-    If it does not valid, the user will be prompted again with the prompt
+    Prompts the user and verifies that the response can be turned into the target type and passes the validators.
+    If it is not valid, the user will be prompted again with the prompt
 
-    Note that there can be as many criteria as is needed and that it needs to be a conditional statement in the form of
-    a string that will be evaluated.
+    Note that there can be as many validators as is needed, each returns why the answer is invalid or None if it is
+    valid (see `at_least`, `between`, and `one_of`).
     """
     while True:
         the_input = input(prompt)
         try:
-            the_input = target_type(the_input)
-            for criteria in criterias:
-                assert eval(criteria)
-            return the_input
-        except Exception as e:
+            answer = target_type(the_input)
+        except ValueError as e:
             print(e)
             print(f'Sorry, "{the_input}" is an invalid input. Please try again.')
+            continue
+        messages = [message for validator in validators if (message := validator(answer)) is not None]
+        if not messages:
+            return answer
+        print('\n'.join(messages))
+        print(f'Sorry, "{the_input}" is an invalid input. Please try again.')
 
 
 if __name__ == '__main__':
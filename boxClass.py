@@ -1,5 +1,9 @@
 from enum import Enum
 from vector import Vector2d
+from imageCache import image_cache
+from markup import StyledRun, parse_markup, styled_lines
+from textCache import font_cache, font_key, text_cache
+from textLayout import fit_text, text_width
 import pygame
 from typing import Any
 
@@ -26,6 +30,12 @@ class OverflowingOptions(Enum):
 
 
 
+class BoxEvent(Enum):
+    resize = pygame.VIDEORESIZE
+    click = pygame.MOUSEBUTTONDOWN
+    hover = pygame.MOUSEMOTION
+
+
 class DrawnFrom(Enum):
     topleft = 0
     midtop = 1
@@ -56,12 +66,15 @@ class Box:
     hovered_over_color: str | tuple = 'light green'  # the color the box is filled when hovered over or clicked on
     # TODO: better explanation for "box_draw_from"
     box_draw_from: 'DrawnFrom' = DrawnFrom.center  # the location of the box which is at the drawn position
+    subscribed_events: frozenset['BoxEvent'] = frozenset(BoxEvent)  # the events which the box reacts to
 
     # images
     image_path: str = ''  # if there is an image, then it will be displayed behind the text
     resize_image: bool = True  # scale down the image so that it will fit in the box
     center_image: bool = True  # centers the image; or, the top left of the image is positioned as the top left of the box
     keep_proportion: bool = True  # keeps the image in proportion when scaled
+    smooth_scale: bool = False  # scales the image smoothly, which looks better but is slower
+    image_shaped: bool = False  # only the opaque parts of the image can be hovered over and clicked on
     blending_type: int = pygame.BLEND_RGBA_MAX  # how the image is blended to the background,
     # should the image be lighter than the background, select BLEND_RGBA_MIN
     # should the image be darker than the background, select BLEND_RGBA_MAX
@@ -82,6 +95,18 @@ class Box:
     __selected = False  # is the box selected
     __text_by_line = None  # the text after it has been interpreted
     __images_by_line = None  # the images of the text after it has been rendered
+    __drawn_text = None  # the text of the box when it was last drawn
+    __drawn_area = None  # the area of the display surface the box was last drawn on
+    __dirty = True  # whether the box has changed since it was last drawn
+    # the largest text size which fits for each text and box size, shared by every box
+    __fitted_sizes: dict[tuple, int | None] = {}
+    max_fitted_sizes: int = 1024  # the most text and box sizes remembered
+    max_fitted_size: int = 1024  # the largest size that text will be resized up to
+    # the points covered by a rounded box for each size and corner rounding, shared by every box
+    __rounded_masks: dict[tuple, pygame.mask.Mask] = {}
+    max_rounded_masks: int = 256  # the most box sizes and roundings remembered
+    # the points of the box which can be hovered over, with the box's rect when it was made and the area it covers
+    __hit_mask: tuple[pygame.rect.Rect, pygame.mask.Mask, pygame.rect.Rect] | None = None
 
     def __init__(self, disp_surf: pygame.surface.Surface, pos_func, size_func, text) -> None:
         """
@@ -116,6 +141,9 @@ class Box:
         self.size: 'Vector2d' = self.__size_func(*self.disp_size)
         self.rect = pygame.rect.Rect(list(self.pos), list(self.size))
 
+        # the box drawn with its image and text, when it is not highlighted (False) and when it is (True)
+        self.__composites: dict[bool, tuple[pygame.surface.Surface, pygame.rect.Rect]] = {}
+
     def change_attrs(self, **kwargs) -> 'Box':
         # TODO: add the description of "box_drawn_from" and the type for it too
         """
@@ -131,11 +159,15 @@ class Box:
             margin (positive_or_zero): how much margin there is from the text to the edge of the box
             corner_rounding (positive_or_zero): the radius of the corners of the box if it was to be rounded
             hovered_over_color (color): the color the box is filled when hovered over or clicked on
+            subscribed_events (set[`BoxEvent`]): the events which the box reacts to, boxes on a screen are only given
+                                                 these events
 
             image_path (str): if there is an image, then it will be displayed behind the text
             resize_image (bool): scale down the image so that it will fit in the box
             center_image (bool): centers the image; or, the top left of the image is positioned as the top left of the box
             keep_proportion (bool): keeps the image in proportion when scaled
+            smooth_scale (bool): scales the image smoothly, which looks better but is slower
+            image_shaped (bool): only the opaque parts of the image can be hovered over and clicked on
             blending_type (int): how the image is blended to the background, should the image be lighter than the
                                  background, select BLEND_RGBA_MIN should the image be darker than the background,
                                  select BLEND_RGBA_MAX
@@ -156,6 +188,9 @@ class Box:
         strings = {str: 'True'}
         justification = {Justification: 'True'}
         overflowing_options = {OverflowingOptions: 'True'}
+        box_events = {
+            events_type: 'all(isinstance(event, BoxEvent) for event in value)' for events_type in (frozenset, set, tuple)
+        }
         attributes = {
             # attributes regarding the box itself
             'background_color': colors,
@@ -165,12 +200,15 @@ class Box:
             'margin': positive_or_zero,
             'corner_rounding': positive_or_zero,
             'hovered_over_color': colors,
+            'subscribed_events': box_events,
 
             # attributes regarding image
             'image_path': strings,
             'resize_image': bools,
             'center_image': bools,
             'keep_proportion': bools,
+            'smooth_scale': bools,
+            'image_shaped': bools,
             'blending_type': ints,
 
             # attributes regarding text
@@ -192,119 +230,230 @@ class Box:
             if not eval(attributes[key][type(value)]):
                 raise ValueError(f'"{value}" is not a valid value for the attribute "{key}"')
             self.__setattr__(key, value)
+        self.subscribed_events = frozenset(self.subscribed_events)
+
+        # the text and how the box is drawn could have changed
+        self.__text_by_line = None
+        self.__images_by_line = None
+        self.__composites.clear()
+        self.__hit_mask = None
+        self.__dirty = True
         return self
 
-    def update(self, event: pygame.event.Event) -> Any:
+    def update(self, event: pygame.event.Event, mouse_pos: tuple[int, int] | None = None) -> Any:
         """
+        Updates the state of the box, the box is drawn separately with `draw` once it has changed.
+
         :param event: pygame event
+        :param mouse_pos: the position of the mouse, it is retrieved if it is not given
         :return: `return_when_clicked` if clicked; otherwise, return nothing
         """
         # handling the screen changing sizes
-        if event.type == pygame.VIDEORESIZE:
+        if event.type == pygame.VIDEORESIZE and BoxEvent.resize in self.subscribed_events:
             self.disp_size = self.disp_surf.get_size()
 
             # recalculating values
             self.pos = self.__pos_func(*self.disp_size)
             self.size = self.__size_func(*self.disp_size)
             self.rect = pygame.rect.Rect(list(self.pos), list(self.size))
-            self.__images_by_line = self.convert_text_to_images()
-            self.overflow()
+            self.__images_by_line = None
+            self.__composites.clear()
+            self.__hit_mask = None
+            self.update_text()
+            self.__dirty = True
 
         # handling clicks
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.__hovered_over:
+        if event.type == pygame.MOUSEBUTTONDOWN and BoxEvent.click in self.subscribed_events:
+            self.hovered_over(mouse_pos)  # where the box was clicked, even for boxes which do not react to hovering
+            clicked = self.__hovered_over
+            if BoxEvent.hover not in self.subscribed_events:
+                self.__hovered_over = False  # only boxes which react to hovering are highlighted when hovered over
+            self.__dirty |= self.__selected != clicked
+            if clicked:
                 self.__selected = not self.__selected
                 return self.return_when_clicked
             else:
                 self.__selected = False
 
-        self.hovered_over()  # this method could change how the box is drawn
+        if BoxEvent.hover in self.subscribed_events:
+            was_hovered_over = self.__hovered_over
+            self.hovered_over(mouse_pos)  # this method could change how the box is drawn
+            self.__dirty |= was_hovered_over != self.__hovered_over
+
+    def draw(self) -> pygame.rect.Rect:
+        """
+        Draws the box on the display surface. The box is composited once for how it looks normally and once for how it
+        looks highlighted, so drawing it is a single blit.
+
+        :return: the area of the display surface which was changed, including where the box was last drawn
+        """
+        self.update_text()  # the text can change the size of the box, so it is updated before it is composited
+
+        highlighted = self.__hovered_over or self.__selected
+        if highlighted not in self.__composites:
+            self.__composites[highlighted] = self.composite(highlighted)
+        image, area = self.__composites[highlighted]
+        self.disp_surf.blit(image, area)
+
+        changed_area = area.union(self.__drawn_area) if self.__drawn_area else area
+        self.__drawn_area = area
+        self.__drawn_text = self.text
+        self.__dirty = False
+        return changed_area
+
+    def clear(self, background_color: str | tuple) -> pygame.rect.Rect | None:
+        """
+        Covers the area of the display surface which the box was last drawn on with the background color.
+
+        :return: the area of the display surface which was changed, or None if the box was not drawn
+        """
+        area = self.__drawn_area
+        if area is not None:
+            self.disp_surf.fill(background_color, area)
+        self.__drawn_area = None
+        self.__dirty = True
+        return area
+
+    def invalidate(self) -> None:
+        """Makes the box be drawn again even if it has not changed."""
+        self.__dirty = True
+
+    @property
+    def needs_redraw(self) -> bool:
+        """Whether the box has changed since it was last drawn."""
+        if self.text != self.__drawn_text and self.__drawn_text is not None:  # the text was changed
+            self.__text_by_line = None
+            self.__images_by_line = None
+            self.__composites.clear()
+            self.__drawn_text = None
+            self.__dirty = True
+        return self.__dirty
+
+    @property
+    def is_hovered_over(self) -> bool:
+        return self.__hovered_over
+
+    @property
+    def is_selected(self) -> bool:
+        return self.__selected
 
-        # the methods are called in this order so that the box is behind the image and both are behind the text
-        self.draw_box()
-        self.draw_img()
-        self.draw_text()
+    @property
+    def drawn_area(self) -> pygame.rect.Rect | None:
+        """The area of the display surface the box was last drawn on, or None if it is not drawn."""
+        return self.__drawn_area
+
+    def composite(self, highlighted: bool) -> tuple[pygame.surface.Surface, pygame.rect.Rect]:
+        """
+        Draws the box with its image and text onto a surface of its own.
 
-    def draw_box(self) -> None:
-        """Draws the box on the display surface."""
+        :param highlighted: whether the box is drawn as if it was hovered over or selected
+        :return: the surface and the area of the display surface which it covers
+        """
+        text_positions = self.position_text(self.rect)
+        image_and_position = self.prepare_img(self.rect)
+
+        # the area covered by the box, and by the text and image if they overflow the box
+        area = self.rect.unionall([position for _, position in text_positions] +
+                                  ([image_and_position[1]] if image_and_position else []))
+        surface = pygame.surface.Surface(area.size, pygame.SRCALPHA)
+        offset = -area.left, -area.top
+
+        # drawn in this order so that the box is behind the image and both are behind the text
+        self.draw_box(surface, self.rect.move(offset), highlighted)
+        if image_and_position:
+            image, position = image_and_position
+            self.draw_img(surface, image, position.move(offset))
+        for image, position in text_positions:
+            surface.blit(image, position.move(offset))
+        return surface, area
+
+    def draw_box(self, surface: pygame.surface.Surface, rect: pygame.rect.Rect, highlighted: bool) -> None:
+        """Draws the box on the surface."""
         # changes the box's color if the box is selected/hovered over
         if (self.fill_in_border and self.border_size) or not self.border_size:
-            color = self.hovered_over_color if self.__hovered_over or self.__selected else self.background_color
-            pygame.draw.rect(self.disp_surf, color, self.rect, 0, self.corner_rounding)
+            color = self.hovered_over_color if highlighted else self.background_color
+            pygame.draw.rect(surface, color, rect, 0, self.corner_rounding)
         if self.border_size:
-            pygame.draw.rect(self.disp_surf, self.border_color, self.rect, self.border_size, self.corner_rounding)
-
-    def hovered_over(self) -> None:
-        """Sets `__hovered_over` to True if the box is hovered over and false otherwise."""
-        pos = pygame.mouse.get_pos()
-        if self.rect.collidepoint(pos):  # the mouse curser is on the box if it was not rounded
+            pygame.draw.rect(surface, self.border_color, rect, self.border_size, self.corner_rounding)
 
-            # if there is no rounding, the curser is on the circle
-            if not self.corner_rounding:
-                self.__hovered_over = True
-                return
+    def hovered_over(self, pos: tuple[int, int] | None = None) -> None:
+        """
+        Sets `__hovered_over` to True if the box is hovered over and false otherwise.
 
-            # if the cursor's x or y value is not within a corner which is being rounded
-            rounding = min(self.corner_rounding / 1, self.rect.width / 2, self.rect.height / 2)
-            if abs(self.rect.centerx - pos[0]) < (self.rect.width / 2 - rounding) or \
-                    abs(self.rect.centery - pos[1]) < (self.rect.height / 2 - rounding):
-                self.__hovered_over = True
-                return
+        :param pos: the position of the mouse, it is retrieved if it is not given
+        """
+        if pos is None:
+            pos = pygame.mouse.get_pos()
+        mask, area = self.hit_mask()
+        self.__hovered_over = area.collidepoint(pos) and bool(mask.get_at((pos[0] - area.x, pos[1] - area.y)))
 
-            # finding reference point (it is the center of the closest circle (they are in the corners of the box))
-            if pos[0] > self.rect.centerx:
-                if pos[1] > self.rect.centery:  # bottom right
-                    reference_point = self.rect.bottomright[0] - rounding, self.rect.bottomright[1] - rounding
-                else:  # top right
-                    reference_point = self.rect.topright[0] - rounding, self.rect.topright[1] + rounding
+    def hit_mask(self) -> tuple[pygame.mask.Mask, pygame.rect.Rect]:
+        """
+        Returns the points which can be hovered over and the area of the display surface they cover. The mask is only
+        made again when the box is moved or resized, or its attributes are changed.
+        """
+        if self.__hit_mask is None or self.__hit_mask[0] != self.rect:
+            image_and_position = self.prepare_img(self.rect) if self.image_shaped else None
+            if image_and_position:  # the shape of the image, from the parts of it which are not transparent
+                image, area = image_and_position
+                mask = pygame.mask.from_surface(image)
             else:
-                if pos[1] > self.rect.centery:  # bottom left
-                    reference_point = self.rect.bottomleft[0] + rounding, self.rect.bottomleft[1] - rounding
-                else:  # top left
-                    reference_point = self.rect.topleft[0] + rounding, self.rect.topleft[1] + rounding
-
-            # using distance to the center of the closest circle to determine if the curser is in the circle, making it
-            # inside the box
-            dist_to_reference_point = ((reference_point[0] - pos[0]) ** 2 + (reference_point[1] - pos[1]) ** 2) ** .5
-            self.__hovered_over = dist_to_reference_point < rounding
+                mask, area = self.rounded_mask(self.rect.size, self.corner_rounding), self.rect.copy()
+            self.__hit_mask = self.rect.copy(), mask, area
+        return self.__hit_mask[1], self.__hit_mask[2]
+
+    @classmethod
+    def rounded_mask(cls, size: tuple[int, int], corner_rounding: int) -> pygame.mask.Mask:
+        """Returns the points covered by a box of the size, with its corners rounded the same way they are drawn."""
+        key = size, corner_rounding
+        if key in cls.__rounded_masks:
+            return cls.__rounded_masks[key]
+
+        if corner_rounding:
+            surface = pygame.surface.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, 'white', surface.get_rect(), 0, int(corner_rounding))
+            mask = pygame.mask.from_surface(surface)
         else:
-            self.__hovered_over = False
-
-    def draw_img(self) -> None:
-        """Draws the image on the display surface."""
-        if self.image_path:
-            image = pygame.image.load(self.image_path)  # retrieving
-            if self.resize_image:
-                if self.keep_proportion:
-                    scale_up = min(
-                        (self.rect.width - self.margin) / image.get_width(),
-                        (self.rect.height - self.margin) / image.get_height()
-                    )
-                    image = pygame.transform.scale(image, image.get_rect().scale_by(scale_up, scale_up).size)
-                else:
-                    display_area = self.rect.width - self.margin, self.rect.height - self.margin
-                    image = pygame.transform.scale(image, display_area)  # scaling image
-            image_size = image.get_size()  # getting size
-            image = image.convert_alpha()  # removing transparent parts of image
-
-            # the position of the image (centering it or putting it on the top left)
-            pos = (self.rect.center[0] - image_size[0]/2 + 1, self.rect.center[1] - image_size[1]/2 + 1) \
-                if self.center_image else self.rect.topleft
-
-            # rounding the corners of the image if it is resized
-            if self.corner_rounding and self.resize_image:
-                pygame.draw.rect(self.disp_surf, 'black', (*pos, *image_size), border_radius=self.corner_rounding)
-            flag = pygame.BLEND_RGBA_MAX if self.resize_image else 0
-            self.disp_surf.blit(image, pos, None, flag)
+            mask = pygame.mask.Mask(size, fill=True)
+        if len(cls.__rounded_masks) >= cls.max_rounded_masks:
+            cls.__rounded_masks.clear()
+        cls.__rounded_masks[key] = mask
+        return mask
 
-    def draw_text(self) -> None:
-        """Draws the text on the display surface."""
+    def prepare_img(self, rect: pygame.rect.Rect) -> tuple[pygame.surface.Surface, pygame.rect.Rect] | None:
+        """
+        Loads and scales the image for a box covering `rect`.
 
-        if self.__text_by_line is None:
-            self.__text_by_line = self.interpret_text()
-        if self.__images_by_line is None:
-            self.__images_by_line = self.convert_text_to_images()
-            self.overflow()
+        :return: the image and where it is drawn, or None if the box has no image
+        """
+        if not self.image_path:
+            return None
+        # retrieving, and scaling the image only if it has not already been scaled to this size
+        if self.resize_image:
+            display_area = rect.width - self.margin, rect.height - self.margin
+            image = image_cache.scaled(self.image_path, display_area, self.keep_proportion, self.smooth_scale)
+        else:
+            image = image_cache.load(self.image_path)
+        image_size = image.get_size()  # getting size
+
+        # the position of the image (centering it or putting it on the top left)
+        pos = (rect.center[0] - image_size[0]/2 + 1, rect.center[1] - image_size[1]/2 + 1) \
+            if self.center_image else rect.topleft
+        return image, pygame.rect.Rect(pos, image_size)
+
+    def draw_img(self, surface: pygame.surface.Surface, image: pygame.surface.Surface, position: pygame.rect.Rect) \
+            -> None:
+        """Draws the image prepared by `prepare_img` on the surface."""
+        # rounding the corners of the image if it is resized
+        if self.corner_rounding and self.resize_image:
+            pygame.draw.rect(surface, 'black', position, border_radius=self.corner_rounding)
+        flag = pygame.BLEND_RGBA_MAX if self.resize_image else 0
+        surface.blit(image, position, None, flag)
+
+    def position_text(self, rect: pygame.rect.Rect) -> list[tuple[pygame.surface.Surface, pygame.rect.Rect]]:
+        """Returns the images of the text along with where they are drawn for a box covering `rect`."""
+        if not self.__images_by_line:
+            return []
 
         top_justification = [Justification.topleft, Justification.midtop, Justification.topright]
         mid_ver_justification = [Justification.midleft, Justification.midright, Justification.center]
@@ -312,8 +461,9 @@ class Box:
         left_justification = [Justification.topleft, Justification.midleft, Justification.bottomleft]
         mid_hor_justification = [Justification.midtop, Justification.center, Justification.midbottom]
 
-        # total height of the text
-        total_image_height = sum(max(image.get_height() for image in line) for line in self.__images_by_line)
+        # the height of each line and the total height of the text
+        line_heights = [max((image.get_height() for image in line), default=0) for line in self.__images_by_line]
+        total_image_height = sum(line_heights)
 
         # handling the height offset between the lines:
         if self.text_justification in top_justification:
@@ -321,26 +471,28 @@ class Box:
         elif self.text_justification in mid_ver_justification:
             vertical_offset = (total_image_height * (1 / len(self.__images_by_line) - 1)) / 2
         else:  # justification is bottom left, right, or middle
-            vertical_offset = -total_image_height + max(image.get_height() for image in self.__images_by_line[-1])
+            vertical_offset = -total_image_height + line_heights[-1]
 
+        positions = []
         for i, line in enumerate(self.__images_by_line):
-            total_image_width = sum(image.get_width() for image in line)
-            if self.text_justification in left_justification:
-                horizontal_offset = 0
-            elif self.text_justification in mid_hor_justification:
-                horizontal_offset = (-total_image_width + line[0].get_width()) / 2
-            else:  # justification is top right, middle right, bottom right
-                horizontal_offset = -total_image_width + line[0].get_width()
+            if line:
+                total_image_width = sum(image.get_width() for image in line)
+                if self.text_justification in left_justification:
+                    horizontal_offset = 0
+                elif self.text_justification in mid_hor_justification:
+                    horizontal_offset = (-total_image_width + line[0].get_width()) / 2
+                else:  # justification is top right, middle right, bottom right
+                    horizontal_offset = -total_image_width + line[0].get_width()
 
             for j, image in enumerate(line):
                 # used to center the text within its line
                 if self.text_justification in top_justification:
-                    addition = (max(img.get_height() for img in line) - image.get_height()) / 2
+                    addition = (line_heights[i] - image.get_height()) / 2
                 elif self.text_justification in mid_ver_justification:
                     addition = 0
                 else:
-                    addition = -(max(img.get_height() for img in line) - image.get_height()) / 2
-                blit_pos = self.justify_text(image, vertical_offset + addition, horizontal_offset)
+                    addition = -(line_heights[i] - image.get_height()) / 2
+                positions.append((image, self.justify_text(image, vertical_offset + addition, horizontal_offset, rect)))
 
                 # handling width
                 if j < len(line) - 1:
@@ -351,73 +503,93 @@ class Box:
                     else:  # justification is top right, middle right, bottom right
                         horizontal_offset += line[j + 1].get_width()
 
-                # drawing the text
-                self.disp_surf.blit(image, blit_pos)
-
             # handling height
             if i < len(self.__images_by_line) - 1:
                 if self.text_justification in top_justification:
-                    vertical_offset += max(image.get_height() for image in line)
+                    vertical_offset += line_heights[i]
                 elif self.text_justification in mid_ver_justification:
-                    vertical_offset += (max(image.get_height() for image in line) +
-                                        max(image.get_height() for image in self.__images_by_line[i + 1])) / 2
+                    vertical_offset += (line_heights[i] + line_heights[i + 1]) / 2
                 else:
-                    vertical_offset += max(image.get_height() for image in self.__images_by_line[i + 1])
+                    vertical_offset += line_heights[i + 1]
+        return positions
 
-    def convert_text_to_images(self) -> list[list[pygame.surface.Surface]]:
+    def update_text(self) -> None:
+        """Interprets and renders the text if it has not been already, resizing the box or the text if it overflows."""
+        if self.__text_by_line is None:
+            self.__text_by_line = self.interpret_text()
+        if self.__images_by_line is None:
+            self.__images_by_line = self.convert_text_to_images()
+            self.overflow()
+
+    def convert_text_to_images(self, text_by_line: styled_lines | None = None) \
+            -> list[list[pygame.surface.Surface]]:
         """
         Converts text with its properties into images of the text.
 
+        :param text_by_line: the interpreted text to convert, the text of the box if None
         :returns: A list of lines which have images of the text
         """
+        lines = self.layout_text(text_by_line)
+        if lines is None:
+            return self.error_message
+        return [[self.render_text(text, properties) for text, properties in line] for line in lines]
+
+    def layout_text(self, text_by_line: styled_lines | None = None) -> list[list[tuple[str, dict]]] | None:
+        """
+        Splits the interpreted text into the lines which will be displayed, wrapping it by measuring the text so that
+        only the final lines need to be rendered.
+
+        :param text_by_line: the interpreted text to lay out, the text of the box if None
+        :returns: A list of lines which have text and its properties, or None if the box is too small for the text
+        """
+        if text_by_line is None:
+            text_by_line = self.__text_by_line
 
-        lines: list[list[pygame.surface.Surface]] = []
-        for line in self.__text_by_line:
+        lines: list[list[tuple[str, dict]]] = []
+        for line in text_by_line:
             used_space = 0  # space already taken up in each line (0 for a new line, >0 for a continuation)
 
             if not self.text_wrap:
-                lines.append([self.render_text(*text_and_properties) for text_and_properties in line])
+                lines.append([(text, properties) for text, properties in line])
                 continue
 
-            for text_and_properties in line:
+            for text, properties in line:
+                font = font_cache.get(properties['f'], properties['s'], properties['b'], properties['i'])
                 # looping while there is leftover on each line after wrapping
-                # if there is a continuation, only allow wrapping by word                    ˅˅˅˅˅˅˅˅˅˅˅˅˅˅
-                while (image_and_leftover := self.wrap_text(text_and_properties, used_space, not used_space))[1]:
-                    # in the loop, is the image of the rendered text which can fit in the text box
+                # if there is a continuation, only allow wrapping by word                             ˅˅˅˅˅˅˅˅˅˅˅˅˅˅
+                while (text_and_leftover := fit_text(text, font, self.line_length() - used_space, not used_space))[1]:
+                    # in the loop, is the text which can fit in the text box
                     # and the text that was left over and needs to be placed in another line
 
-                    image, leftover = image_and_leftover  # image and leftover text
+                    fitted_text, leftover = text_and_leftover
 
-                    if image is None:  # go to the next line, the text cannot be wrapped by word
+                    if fitted_text is None:  # go to the next line, the text cannot be wrapped by word
                         if not used_space:
-                            return [
-                                [self.render_text('Sorry,', self.default_properties)],
-                                [self.render_text('window', self.default_properties)],
-                                [self.render_text('is too', self.default_properties)],
-                                [self.render_text('small', self.default_properties)]
-                            ]
+                            return None
                         used_space = 0
                         continue
 
-                    text_and_properties = (leftover.strip(' '), text_and_properties[1])
+                    text = leftover.strip(' ')
 
-                    if used_space == 0:  # if this is on a new line, display the image in the next line
-                        lines.append([image])
-                    else:  # if this is a continuation of the previous line, display the image on the previous line
-                        lines[-1].append(image)
+                    if used_space == 0:  # if this is on a new line, display the text in the next line
+                        lines.append([(fitted_text, properties)])
+                    else:  # if this is a continuation of the previous line, display the text on the previous line
+                        lines[-1].append((fitted_text, properties))
                         used_space = 0  # the program moves to a new line
 
-                if image_and_leftover[0].get_width() == 0:  # image is of ' ', skip it
+                fitted_text = text_and_leftover[0]
+                width = text_width(font, fitted_text)
+                if width == 0:  # the text takes up no space, skip it
                     continue
 
-                # if this was a continuation of the previous line, add the image to the previous line
+                # if this was a continuation of the previous line, add the text to the previous line
                 if used_space:
-                    lines[-1].append(image_and_leftover[0])
+                    lines[-1].append((fitted_text, properties))
 
-                # this was not a continuation of the previous line, add the image to a new line
+                # this was not a continuation of the previous line, add the text to a new line
                 else:
-                    lines.append([image_and_leftover[0]])
-                used_space += image_and_leftover[0].get_width()  # the program continues from this line
+                    lines.append([(fitted_text, properties)])
+                used_space += width  # the program continues from this line
 
         return lines
 
@@ -430,33 +602,16 @@ class Box:
             return
 
         # handling overflow:
-        # TODO: resize_text needs to be further tested and have it's speed improved
         if self.if_overflowing_text == OverflowingOptions.resize_text:
-            # need to increment/decrement the sizes of text so that it fits in the box
-            # if the size of the text is 1, then end the decrementing and state that the text cannot be displayed
-            print(self.__text_by_line)
-
-            target = self.rect.height - 2 * self.margin
-
-            if height_of_lines == target:  # nothing needs to be resized
+            # the sizes of the text are scaled so that it fills the box, if even the smallest text does not fit, then
+            # state that the text cannot be displayed
+            if height_of_lines == self.rect.height - 2 * self.margin:  # nothing needs to be resized
+                return
+            largest_size = self.fit_text_size()
+            if largest_size is None:
+                self.__images_by_line = self.error_message
                 return
-            while height_of_lines < target:  # text needs to be resized up
-                for line in self.__text_by_line:
-                    for text_and_properties in line:
-                        text_and_properties[1]['s'] += 1
-                lines = self.convert_text_to_images()
-                self.__images_by_line = lines
-                height_of_lines = sum(max(image.get_height() for image in line) for line in lines)
-            while height_of_lines > target:  # text needs to be resized down
-                for line in self.__text_by_line:
-                    for text_and_properties in line:
-                        if text_and_properties[1]['s'] <= 1:
-                            self.__images_by_line = self.error_message
-                            return
-                        text_and_properties[1]['s'] -= 1
-                lines = self.convert_text_to_images()
-                self.__images_by_line = lines
-                height_of_lines = sum(max(image.get_height() for image in line) for line in lines)
+            self.__images_by_line = self.convert_text_to_images(self.scale_text(largest_size))
         elif self.if_overflowing_text == OverflowingOptions.resize_box_down:
             self.rect.height = height_of_lines + 2 * self.margin
         else:  # resize box to the right
@@ -464,16 +619,71 @@ class Box:
             self.rect.width *= height_of_lines / (self.rect.height - 2 * self.margin)
             self.convert_text_to_images()
 
-    def justify_text(self, image: pygame.surface.Surface, vertical_offset: int | float, horizontal_offset: int | float) \
-            -> pygame.rect.Rect:
-        """Returns the position to display the text."""
-        left = self.rect.left + self.margin + horizontal_offset
-        mid_horizontal = self.rect.centerx + horizontal_offset
-        right = self.rect.right - self.margin + horizontal_offset
+    def fit_text_size(self) -> int | None:
+        """
+        Binary searches for the largest size of the largest text which lets the text fit within the height of the box,
+        with the other text being scaled in proportion. Results are remembered for each text and box size so that
+        returning to a size which was already seen does not need the text to be laid out again.
 
-        top = self.rect.top + self.margin + vertical_offset
-        mid_vertical = self.rect.centery + vertical_offset
-        bottom = self.rect.bottom - self.margin + vertical_offset
+        :returns: the size of the largest text, or None if the text cannot fit
+        """
+        key = (self.text, tuple(self.rect.size), self.margin, self.text_wrap, tuple(self.default_properties.values()))
+        if key in self.__fitted_sizes:
+            return self.__fitted_sizes[key]
+
+        target = self.rect.height - 2 * self.margin
+
+        def fits(size: int) -> bool:
+            lines = self.layout_text(self.scale_text(size))
+            if lines is None:
+                return False
+            height_of_lines = sum(
+                max(font_cache.get(properties['f'], properties['s'], properties['b'], properties['i']).get_height()
+                    for _, properties in line)
+                for line in lines
+            )
+            return height_of_lines <= target
+
+        if not fits(1):
+            largest_size = None
+        else:
+            # finding a size which does not fit, then searching between it and the largest size known to fit
+            fitting, too_large = 1, 2
+            while too_large <= self.max_fitted_size and fits(too_large):
+                fitting, too_large = too_large, too_large * 2
+            while too_large - fitting > 1:
+                size = (fitting + too_large) // 2
+                if fits(size):
+                    fitting = size
+                else:
+                    too_large = size
+            largest_size = fitting
+
+        if len(self.__fitted_sizes) >= self.max_fitted_sizes:
+            self.__fitted_sizes.clear()
+        self.__fitted_sizes[key] = largest_size
+        return largest_size
+
+    def scale_text(self, largest_size: int) -> styled_lines:
+        """Returns a copy of the interpreted text with its sizes scaled so that the largest text is `largest_size`."""
+        scale = largest_size / max((properties['s'] for line in self.__text_by_line for _, properties in line),
+                                   default=largest_size)
+        return tuple(
+            tuple(StyledRun(text, properties | {'s': max(round(properties['s'] * scale), 1)})
+                  for text, properties in line)
+            for line in self.__text_by_line
+        )
+
+    def justify_text(self, image: pygame.surface.Surface, vertical_offset: int | float, horizontal_offset: int | float,
+                     rect: pygame.rect.Rect) -> pygame.rect.Rect:
+        """Returns the position to display the text in a box covering `rect`."""
+        left = rect.left + self.margin + horizontal_offset
+        mid_horizontal = rect.centerx + horizontal_offset
+        right = rect.right - self.margin + horizontal_offset
+
+        top = rect.top + self.margin + vertical_offset
+        mid_vertical = rect.centery + vertical_offset
+        bottom = rect.bottom - self.margin + vertical_offset
 
         justification_to_position = {
             Justification.topleft: image.get_rect(topleft=(left, top)),
@@ -490,40 +700,33 @@ class Box:
         }
         return justification_to_position[self.text_justification]
 
-    def wrap_text(self, text_and_properties: list[str, dict], used_space: int | float, char_wrap: bool = True) \
-            -> tuple[None | pygame.surface.Surface, str]:
-
-        text, properties = text_and_properties
-        leftover = ''
-
-        while (image := self.render_text(text, properties)).get_width() > self.line_length() - used_space:
-            if len(text) == 1:
-                return None, text
-            i = text.rfind(' ')
-            if i == -1 or i == 0:
-                if not char_wrap:
-                    return None, text
-                i = len(text) - 1
-            leftover = text[i:] + leftover
-            text = text[:i]
-
-        return image, leftover
-
     def line_length(self, position: None | Vector2d = None, width: None | int = None) -> int | float:
         # TODO: additional logic is needed to calculate the length of a line on a curved box
         return self.rect.width - 2 * self.margin
 
     @staticmethod
     def render_text(text: str, properties: dict[str, int | bool | str]) -> pygame.surface.Surface:
-        """Renders text."""
-        font = pygame.font.SysFont(properties['f'], properties['s'], bold=properties['b'], italic=properties['i'])
-        return font.render(text, True, properties['c'])
+        """Renders text, reusing the surface if the same text has already been rendered."""
+        return text_cache.render(text, properties['f'], properties['s'], properties['b'], properties['i'],
+                                 properties['c'])
 
-    def interpret_text(self) -> list[list[list[str, dict], ], ] | list:
+    def fonts_used(self) -> set[font_key]:
+        """Returns the fonts needed to render the text of the box, so that they can be loaded ahead of time."""
+        if self.__text_by_line is None:
+            self.__text_by_line = self.interpret_text()
+        fonts = {(properties['f'], properties['s'], properties['b'], properties['i'])
+                 for line in self.__text_by_line for _, properties in line}
+        default_properties = self.default_properties  # used for the error message
+        fonts.add((default_properties['f'], default_properties['s'], default_properties['b'], default_properties['i']))
+        return fonts
+
+    def interpret_text(self) -> styled_lines:
         # noinspection GrazieInspection
         """
         Interprets `self.text`, changing properties of text between tags and separating `self.text` into different
-        lines. Tags are denoted with angle brackets "<>" with the properties being denoted using the below format:
+        lines (see `parse_markup`). The result is shared by every box with the same text and default properties, so it
+        cannot be changed. Tags are denoted with angle brackets "<>" with the properties being denoted using the below
+        format:
             PROPERTY:VALUE (special cases are with the properties bold and italic)
         ex.
         - "<c: green, s: 20, f: arial, b>Yes</>\n<S:20,f: arial, I>This means you agree</>"
@@ -540,84 +743,7 @@ class Box:
           UC(BLUE; color is BLUE)UC(This means you agree; size is 20, font is arial, italic)UC(BLUE; color is blue)UC
           UC(BLUE; color is blue)UC(ITALIC; italic)UC
           """
-        default_properties = self.default_properties
-
-        # removing unwanted whitespaces:
-        i = 0
-        processed_text = ''
-        while i < len(self.text):
-            if self.text[i] == '<':
-                starting_i = i
-                i += 1
-                while self.text[i] in ' \n':
-                    i += 1
-                if self.text[i] != '>':
-                    processed_text += self.text[starting_i: i + 1]
-                i += 1
-                continue
-            processed_text += self.text[i]
-            i += 1
-        self.text = processed_text
-
-        text_segments: list[list[str, dict], ] = [  # splitting the text up and adding default properties to them
-            [text_segment, default_properties.copy()] for text_segment in self.text.split('\n')
-        ]
-        # list of lines containing text segments and properties
-        text_by_line: list[list[list[str, dict], ], ] | list = []
-        # for tags that cover multiple lines, properties are "continued"
-        continued_properties = default_properties.copy()
-
-        # each loop processes a line
-        for text_segment, segment_properties in text_segments:  # `text_segment`: str, `segment_properties`: dict
-            text_by_line.append([])  # adding a new line
-            add_processed_text = lambda processed_text: text_by_line[-1].append(processed_text)  # helper function
-
-            # each loop processes a tag
-            while text_segment.count('<') > 0 and text_segment.count('>') > 0:
-
-                tag_start = text_segment.find('<')
-                tag_end = text_segment.find('>')
-                tag_contents = text_segment[tag_start + 1:tag_end].lower().replace(' ', '')
-
-                # adding the text before tags to `interpreted_text` and removing processed segments of it:
-                # the text before an ending tag has its properties continued
-                # the text before a starting tag has default properties
-                text_before_properties = continued_properties if tag_contents == '/' else default_properties
-                if tag_start != 0:  # has text before the tag
-                    add_processed_text([text_segment[:tag_start], text_before_properties])
-                text_segment = text_segment[tag_end + 1:]  # remove the tag and anything before it (it was processed)
-                if tag_contents == '/':
-                    continue  # end tags have no properties to process, so continue
-
-                # setting segment properties to the correct values:
-                for key_value_pair in tag_contents.split(','):  # `key_value_pair` is a string like this: 's:20'
-                    key, _, value = key_value_pair.partition(':')  # `key` = 's', `value` = '20'
-                    key = key[0]
-                    if key == 'b' or key == 'i':
-                        value = True  # bold or italic
-                    elif key == 's': value = int(value)  # size
-                    else:
-                        value = value.replace('-', ' ')  # color or font
-                    segment_properties[key] = value
-
-                # adding the text inside the tags to `interpreted_text`:
-                text = text_segment[:text_segment.find('</>')] if '</>' in text_segment else text_segment  # text to add
-                add_processed_text([text, segment_properties])
-                if '</>' in text_segment:  # there is an end tag
-                    text_segment = text_segment[text_segment.find('</>')+3:]  # removing processed values
-                    segment_properties = default_properties.copy()  # resetting `segment_properties`
-                    continue
-
-                # there is not an end tag
-                continued_properties = segment_properties.copy()  # continuing `segment_properties`
-                text_segment = ''  # all values processed, reset `text_segment`
-
-            if text_segment:  # adding all unprocessed values
-                if continued_properties != default_properties:
-                    add_processed_text([text_segment, continued_properties])
-                else:
-                    add_processed_text([text_segment, default_properties])
-        return text_by_line
+        return parse_markup(self.text, tuple(self.default_properties.items()))
 
     @property
     def error_message(self) -> list[list[pygame.surface.Surface,],]:
@@ -0,0 +1,249 @@
+"""
+Solving the end of the game exactly once the bots are walled off from each other
+"""
+import shelve
+from time import perf_counter
+from boardClass import Board, LOST
+from symmetry import SYMMETRIES
+from territory import flood, neighbours
+
+
+TURN_BUDGET = 200_000  # the most boards the solver looks at for each turn when choosing a bot's turn
+TURN_TIME_SHARE = .5  # the part of a bot's time for a turn the solver can use, the rest is left for the search
+
+
+def solve_deadline(start: float, time_limit: float | None) -> float | None:
+    """Returns when a bot whose turn started at `start` stops solving the endgame, None if it has no time limit."""
+    return start + time_limit * TURN_TIME_SHARE if time_limit is not None else None
+
+
+class Unsolved(Exception):
+    """Raised inside of the solver once it has looked at as many boards as it was allowed to, or its time ran out."""
+
+
+class EndgameSolver:
+    """
+    Finds how many more turns a bot can take in a region that no other bot can reach, which decides the game once every
+    bot is walled off. Every turn fills one free cell, so the bot can take at most as many turns as the region has
+    cells, and the search stops as soon as a line reaches that.
+
+    Results are stored by the shape of the region and where the bot is in it, with turned and flipped regions stored
+    once, and can be kept in a file (see `shelve`) so that they are reused by later games.
+    """
+
+    def __init__(self, path: str | None = None, max_cells: int = 24, max_states: int = 1 << 20) -> None:
+        """
+        :param path: the file to keep the results in, None to only keep them in memory
+        :param max_cells: the largest region that is solved, larger regions are left to the search
+        :param max_states: how many boards are remembered while solving before they are forgotten
+        """
+        if max_cells <= 0 or max_states <= 0:
+            raise ValueError('The largest region and the number of boards remembered must be positive')
+        self.path = path
+        self.max_cells = max_cells
+        self.max_states = max_states
+        self.hits = 0
+        self.solved = 0
+        self.__table: dict[str, int] = {}  # the results for each region by `canonical_key`
+        self.__states: dict[tuple[int, int, int], int] = {}  # the results of the boards seen while solving
+        self.__budget = -1  # how many more boards the current solve can look at, negative for no limit
+        self.__deadline: float | None = None  # when the current solve has to stop, None for no limit
+        self.__unsaved: dict[str, int] = {}  # results which have not been written to the file yet
+        self.__file: shelve.Shelf | None = None
+
+    @property
+    def file(self) -> shelve.Shelf | None:
+        if self.__file is None and self.path is not None:
+            self.__file = shelve.open(self.path)
+        return self.__file
+
+    def save(self) -> None:
+        """Writes the results solved since the last save to the file, writing them one by one is slow."""
+        if self.__unsaved and self.file is not None:
+            self.file.update(self.__unsaved)
+            self.file.sync()
+        self.__unsaved = {}
+
+    def close(self) -> None:
+        """Writes the results to the file and closes it."""
+        self.save()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __enter__(self) -> 'EndgameSolver':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__table)
+
+    @staticmethod
+    def region(board: Board, player: int) -> int:
+        """Returns the free cells that the player's bot can reach."""
+        index = board.players[player]
+        free = board.board_mask & ~board.occupied
+        start = neighbours(index, board.stride) & free
+        return flood(start, free, board.stride) if start else 0
+
+    @staticmethod
+    def is_separated(board: Board, player: int, region: int) -> bool:
+        """Whether no other bot is next to the region, so only the player's bot can reach it."""
+        return not any(
+            region & neighbours(index, board.stride)
+            for other, index in enumerate(board.players) if other != player and index != LOST
+        )
+
+    @staticmethod
+    def canonical_key(region: int, index: int, board: Board) -> str:
+        """
+        Returns the same key for a region and bot cell as for any turned or flipped copy of them, anywhere on any
+        board.
+        """
+        cells = [board.position(index)]
+        while region:
+            lowest = region & -region
+            cells.append(board.position(lowest.bit_length() - 1))
+            region ^= lowest
+        left = min(x for x, _ in cells)
+        top = min(y for _, y in cells)
+        cells = [(x - left, y - top) for x, y in cells]
+        width = max(x for x, _ in cells) + 1
+        height = max(y for _, y in cells) + 1
+
+        keys = []
+        for symmetry in SYMMETRIES:
+            moved = [symmetry(x, y, width, height) for x, y in cells]
+            moved_width = max(x for x, _ in moved) + 1
+            bits = [y * moved_width + x for x, y in moved]
+            keys.append((moved_width, sum(1 << bit for bit in bits[1:]), bits[0]))
+        moved_width, mask, bot = min(keys)
+        return f'{moved_width}:{mask:x}:{bot}'
+
+    def survival(self, board: Board, player: int, region: int | None = None, budget: int | None = None,
+                 deadline: float | None = None) -> int | None:
+        """
+        Returns how many more turns the player's bot can take if no other bot can reach its region.
+
+        :param region: the cells the bot can reach, found from the board if None
+        :param budget: the most boards to look at, None for no limit. The boards that were solved are remembered, so
+                       trying again later continues where this stopped
+        :param deadline: the `perf_counter` time to stop at, None for no limit
+        :return: the number of turns, None if the region is larger than `max_cells` or the budget or time ran out
+        """
+        if region is None:
+            region = self.region(board, player)
+        if region.bit_count() > self.max_cells:
+            return None
+        key = self.canonical_key(region, board.players[player], board)
+        turns = self.__table.get(key)
+        if turns is None and self.file is not None:
+            turns = self.file.get(key)
+            if turns is not None:
+                self.__table[key] = turns
+        if turns is not None:
+            self.hits += 1
+            return turns
+
+        self.__budget = -1 if budget is None else budget
+        self.__deadline = deadline
+        try:
+            turns = self.longest(board.players[player], region, board.stride, board.direction_offsets)
+        except Unsolved:
+            return None
+        self.solved += 1
+        self.__table[key] = turns
+        if self.path is not None:
+            self.__unsaved[key] = turns
+        return turns
+
+    def best_action(self, board: Board, player: int, actions: list[int] | None = None,
+                    budget: int | None = None, deadline: float | None = None) -> int | None:
+        """
+        Returns the turn which lets the player's bot take the most turns, if no other bot can reach its region.
+
+        :param budget: the most boards to look at for each turn, None for no limit
+        :param deadline: the `perf_counter` time to stop at, None for no limit
+        :return: the turn encoded with `encode_action`, None if the bot is not walled off, the region is too large, or
+                 the budget or time ran out
+        """
+        region = self.region(board, player)
+        if not self.is_separated(board, player, region) or region.bit_count() > self.max_cells:
+            return None
+        if actions is None:
+            actions = board.actions(player)
+        best_action, best_turns = None, -1
+        for action in actions:
+            after = board.copy()
+            after.play(player, action)
+            turns = self.survival(after, player, budget=budget, deadline=deadline)
+            if turns is None:
+                return None
+            if turns > best_turns:
+                best_action, best_turns = action, turns
+                if turns == region.bit_count() - 1:  # every cell is used
+                    break
+        return best_action
+
+    def longest(self, index: int, region: int, stride: int, offsets: tuple[int, int, int, int]) -> int:
+        """Returns the most turns a bot on the cell can take, where `region` is every free cell it can reach."""
+        key = stride, index, region
+        turns = self.__states.get(key)
+        if turns is not None:
+            return turns
+        if not self.__budget or (self.__deadline is not None and perf_counter() > self.__deadline):
+            raise Unsolved
+        self.__budget -= 1
+
+        most = region.bit_count()  # every turn fills a cell
+        best = 0
+        for move_offset in offsets:
+            new_index = index + move_offset
+            if not region >> new_index & 1:
+                continue
+            after = region ^ (1 << new_index | 1 << index)  # the cell the bot left is free
+            for tile_offset in offsets:
+                tile = new_index + tile_offset
+                if not after >> tile & 1:
+                    continue
+                left = after ^ 1 << tile
+                start = neighbours(new_index, stride) & left
+                reachable = flood(start, left, stride) if start else 0
+                best = max(best, 1 + self.longest(new_index, reachable, stride, offsets))
+                if best == most:
+                    break
+            if best == most:
+                break
+
+        if len(self.__states) >= self.max_states:
+            self.__states.clear()
+        self.__states[key] = best
+        return best
+
+    def outcome(self, board: Board, player: int, budget: int | None = None,
+                deadline: float | None = None) -> list[int] | None:
+        """
+        Decides the game if every bot is walled off from every other bot.
+
+        :param player: the player whose turn it is
+        :param budget: the most boards to look at for each bot, None for no limit
+        :param deadline: the `perf_counter` time to stop at, None for no limit
+        :return: the players in the order that they lose, the last is the winner, None if the game is not decided yet
+        """
+        turns = {}
+        for other, index in enumerate(board.players):
+            if index == LOST:
+                continue
+            region = self.region(board, other)
+            if not self.is_separated(board, other, region):
+                return None
+            turns[other] = self.survival(board, other, region, budget, deadline)
+            if turns[other] is None:
+                return None
+
+        # a player loses on the turn after their last, players who move earlier in a round lose first on ties
+        num_players = len(board.players)
+        return sorted(turns, key=lambda other: (turns[other], (other - player) % num_players))
+
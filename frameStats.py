@@ -0,0 +1,65 @@
+"""
+A class for keeping track of how long frames take to update and render
+"""
+from collections import deque
+import pygame
+from textCache import text_cache
+from timings import percentile
+
+
+class FrameStats:
+    """
+    Keeps the update and render times of the most recent frames, so that percentiles of them can be logged or shown on
+    the display.
+    """
+    percentiles = (50, 95, 99)  # the percentiles that are reported
+
+    # overlay defaults
+    overlay_text_color: str | tuple = 'black'
+    overlay_background_color: str | tuple = 'white'
+    overlay_text_size: int = 14
+
+    def __init__(self, window: int = 240) -> None:
+        """
+        :param window: how many of the most recent frames the percentiles are calculated from
+        """
+        if window <= 0:
+            raise ValueError('The window of frames must be a positive number')
+        self.frames = 0  # the number of frames recorded in total
+        self.update_times: deque[float] = deque(maxlen=window)  # milliseconds
+        self.render_times: deque[float] = deque(maxlen=window)  # milliseconds
+        self.__overlay_area: pygame.rect.Rect | None = None
+
+    def record(self, update_seconds: float, render_seconds: float) -> None:
+        """Records how long updating and rendering a frame took."""
+        self.frames += 1
+        self.update_times.append(update_seconds * 1000)
+        self.render_times.append(render_seconds * 1000)
+
+    def report(self) -> dict[str, dict[int, float]]:
+        """Returns the percentiles of the update and render times in milliseconds."""
+        return {
+            'update': {percent: percentile(self.update_times, percent) for percent in self.percentiles},
+            'render': {percent: percentile(self.render_times, percent) for percent in self.percentiles},
+        }
+
+    def summary(self) -> str:
+        """Returns the percentiles as a line of text, ex. "update p50 0.12 p95 0.30 p99 0.41 ms | render ..."."""
+        return ' | '.join(
+            f'{name} ' + ' '.join(f'p{percent} {time:.2f}' for percent, time in times.items()) + ' ms'
+            for name, times in self.report().items()
+        )
+
+    def draw_overlay(self, surface: pygame.surface.Surface) -> pygame.rect.Rect:
+        """
+        Draws the summary in the top left corner of the surface.
+
+        :return: the area of the surface which was changed, including where the overlay was last drawn
+        """
+        image = text_cache.render(self.summary(), None, self.overlay_text_size, False, False, self.overlay_text_color)
+        area = image.get_rect()
+        changed_area = area.union(self.__overlay_area) if self.__overlay_area else area
+        surface.fill(self.overlay_background_color, changed_area)
+        surface.blit(image, area)
+        self.__overlay_area = area
+        return changed_area
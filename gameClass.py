@@ -1,53 +1,62 @@
 import playerClass
+from boardClass import Board
 from vector import Vector2d
 
 
 class Game:
-    tiles: list['Vector2d'] = list()  # there are no tiles in the beginning
     curr_player_num = 0  # orthogonal
     orthogonal_offset = [[1, 0], [0, 1], [-1, 0], [0, -1]]
 
     def __init__(self, player_locations: tuple['Vector2d'], board_size: 'Vector2d') -> None:
-        self.players = [playerClass.Player(pos, board_size) for pos in player_locations]
+        self.board = Board(board_size.x, board_size.y)  # the positions of the players and the tiles
+        self.players = [playerClass.Player(pos, self.board) for pos in player_locations]
         self.curr_player = self.players[0]
         self.board_size = board_size
-        self.player_pos = list(player_locations)
+
+    @classmethod
+    def from_board(cls, board: Board, player: int = 0) -> 'Game':
+        """Continues a game from a board, such as one replayed from a `GameRecord`, the player takes the next turn."""
+        game = cls.__new__(cls)
+        game.board = board
+        game.players = [playerClass.Player.on_board(board, number) for number in range(len(board.players))
+                        if not board.has_lost(number)]
+        game.curr_player = next(other for other in game.players if other.number == player)
+        game.board_size = Vector2d(board.width, board.height)
+        return game
+
+    @property
+    def tiles(self) -> list['Vector2d']:
+        return [Vector2d(*pos) for pos in self.board.tile_positions]
+
+    @property
+    def player_pos(self) -> list['Vector2d']:
+        return [player.pos for player in self.players]
 
     def player_turn(self, move_dir: 'Vector2d', tile_pos) -> bool:
-        temp = self.player_pos[:]
-        temp.remove(self.curr_player.pos)
-        if not self.curr_player.can_move(move_dir, self.tiles + temp):
+        if not self.curr_player.can_move(move_dir):
             return False
         pos = self.curr_player.pos + move_dir
         if not self.curr_player.can_place(pos, tile_pos):
             return False
         self.curr_player.move(move_dir)
-        self.tiles.append(tile_pos)
+        if not self.place_tile(tile_pos):  # the tile can only be placed on a free cell
+            self.curr_player.move(-Vector2d(*move_dir))
+            return False
         return True
 
     def move_player(self, move_dir: 'Vector2d') -> None:
         """Moves the current player."""
-        temp = self.player_pos[:]
-        temp.remove(self.curr_player.pos)
         return self.curr_player.move(move_dir)
 
     def place_tile(self, tile_pos: 'Vector2d') -> bool:
         """Place a tile, making sure that the tile can be placed."""
-        if tile_pos not in self.player_pos and tile_pos not in self.tiles:
-            self.tiles.append(tile_pos)
-            return True
-        return False
+        return self.board.add_tile(tile_pos)
 
     def remove_lost(self) -> None:
         """Removes a player of the game if the current player cannot move."""
-        pos = self.curr_player.pos
-        for offset in self.orthogonal_offset:
-            if pos + offset not in self.tiles and pos + offset not in self.player_pos:
-                break
-        else:
+        if not self.board.is_stuck(self.curr_player.number):
             return
-        self.player_pos.remove(self.curr_player.pos)
-        self.tiles.append(self.curr_player.pos)
+        self.board.remove_player(self.curr_player.number)
         self.players.remove(self.curr_player)
 
         self.curr_player = self.players[self.curr_player_num]
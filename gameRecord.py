@@ -0,0 +1,315 @@
+"""
+A compact file of played games, which can be written and read one game at a time
+
+The file starts with a header, then each game is:
+    the game header: the size of the rest of the game in bytes, the width and height of the board, the number of
+                     players, and the number of turns
+    the start of each player's bot as (x, y)
+    the turns as 4 bit codes from `encode_action`, two to a byte with the first turn in the low bits
+    a snapshot of the board after every `snapshot_interval` turns, so that any turn can be reached by replaying at most
+    `snapshot_interval - 1` turns
+A player loses on their turn if they cannot move, so losing is never written, it is found again while replaying. After
+the last turn, the players who cannot move are removed until one player is left or the player whose turn it is can move.
+"""
+import struct
+from typing import Iterator
+from boardClass import Board, LOST
+from gameClass import Game
+
+
+MAGIC = b'BTGR'
+VERSION = 2  # version 1 stored the cells of the bots in 2 bytes, which only fit boards of up to 32767 cells
+FILE_HEADER = struct.Struct('<4sHH')  # the magic, the version, and the snapshot interval
+GAME_HEADER = struct.Struct('<IHHBI')  # the size of the rest of the game, width, height, players, and turns
+START = struct.Struct('<HH')
+
+
+class GameRecord:
+    """One game read from a file, the turns are only unpacked when they are needed."""
+
+    def __init__(self, width: int, height: int, starts: list[tuple[int, int]], num_actions: int, packed: bytes,
+                 snapshots: bytes, snapshot_interval: int) -> None:
+        self.width = width
+        self.height = height
+        self.starts = starts
+        self.num_actions = num_actions
+        self.packed = packed
+        self.snapshots = snapshots
+        self.snapshot_interval = snapshot_interval
+
+    def __len__(self) -> int:
+        return self.num_actions
+
+    def action(self, ply: int) -> int:
+        """Returns the turn taken at a ply, the first turn after the bots are placed is ply 0."""
+        if not 0 <= ply < self.num_actions:
+            raise IndexError(f'The game has {self.num_actions} turns')
+        return self.packed[ply >> 1] >> (ply & 1) * 4 & 15
+
+    @property
+    def actions(self) -> list[int]:
+        return [self.action(ply) for ply in range(self.num_actions)]
+
+    def start_board(self) -> Board:
+        board = Board(self.width, self.height)
+        for pos in self.starts:
+            board.add_player(pos)
+        return board
+
+    def board(self, ply: int | None = None) -> tuple[Board, int]:
+        """
+        Rebuilds the board from the snapshot before a ply and the turns after it. After the last turn, the players who
+        cannot move have lost, see `remove_stuck_players`.
+
+        :param ply: how many turns have been taken, every turn if None
+        :return: the board and the player whose turn it is
+        """
+        if ply is None:
+            ply = self.num_actions
+        if not 0 <= ply <= self.num_actions:
+            raise IndexError(f'The game has {self.num_actions} turns')
+        snapshot = ply // self.snapshot_interval
+        if snapshot:
+            size = snapshot_size(self.width, self.height, len(self.starts))
+            board, player = read_snapshot(self.width, self.height, len(self.starts),
+                                          self.snapshots[(snapshot - 1) * size:snapshot * size])
+            done = snapshot * self.snapshot_interval
+        else:
+            board, player, done = self.start_board(), 0, 0
+        for done in range(done, ply):
+            player = take_turn(board, player, self.action(done))
+        if ply == self.num_actions:
+            player = remove_stuck_players(board, player)
+        return board, player
+
+    def boards(self) -> Iterator[tuple[Board, int]]:
+        """Replays the game, yielding the board before each turn and after the last, and whose turn it is."""
+        board, player = self.start_board(), 0
+        for ply in range(self.num_actions):
+            yield board.copy(), player
+            player = take_turn(board, player, self.action(ply))
+        yield board, remove_stuck_players(board, player)
+
+    def game(self, ply: int | None = None) -> Game:
+        """Rebuilds the game after a ply, every turn if None."""
+        board, player = self.board(ply)
+        return Game.from_board(board, player)
+
+
+def take_turn(board: Board, player: int, action: int) -> int:
+    """
+    Plays a turn from a record, first removing the players who cannot move.
+
+    :return: the player whose turn is next
+    """
+    actions = board.actions(player)
+    while not actions:
+        board.remove_player(player)
+        if board.players_left <= 1:
+            raise ValueError('The game was over before the turn, the record is broken')
+        player = board.next_player(player)
+        actions = board.actions(player)
+    if action not in actions:
+        raise ValueError(f'The turn {action} cannot be taken by player {player + 1}, the record is broken')
+    board.play(player, action)
+    return board.next_player(player)
+
+
+def remove_stuck_players(board: Board, player: int) -> int:
+    """
+    Removes the players who cannot move, starting with the player whose turn it is, until one player is left or the
+    player whose turn it is can move. This finds the losses after the last turn of a game, which are not written.
+
+    :return: the player whose turn it is
+    """
+    while board.players_left > 1 and not board.actions(player):
+        board.remove_player(player)
+        player = board.next_player(player)
+    return player
+
+
+def snapshot_size(width: int, height: int, num_players: int) -> int:
+    """Returns the size of a snapshot: the player whose turn it is, the cell of each bot, and a bit for each tile."""
+    return 1 + 4 * num_players + (width * height + 7) // 8
+
+
+def write_snapshot(board: Board, player: int) -> bytes:
+    """Stores a board and the player whose turn it is in `snapshot_size` bytes."""
+    cells = []
+    for index in board.players:
+        if index == LOST:
+            cells.append(LOST)
+        else:
+            x, y = board.position(index)
+            cells.append(y * board.width + x)
+    tiles = 0
+    row_mask = (1 << board.width) - 1
+    for y in range(board.height):
+        tiles |= (board.tiles >> board.index((0, y)) & row_mask) << y * board.width
+    return struct.pack(f'<B{len(cells)}i', player, *cells) + \
+        tiles.to_bytes((board.width * board.height + 7) // 8, 'little')
+
+
+def read_snapshot(width: int, height: int, num_players: int, data: bytes) -> tuple[Board, int]:
+    """Creates the board stored with `write_snapshot`, and returns it with the player whose turn it is."""
+    player, *cells = struct.unpack_from(f'<B{num_players}i', data)
+    dense = int.from_bytes(data[1 + 4 * num_players:], 'little')
+    board = Board(width, height)
+    row_mask = (1 << width) - 1
+    for y in range(height):
+        board.tiles |= (dense >> y * width & row_mask) << board.index((0, y))
+    board.players = [LOST if cell == LOST else board.index((cell % width, cell // width)) for cell in cells]
+    board.occupied |= board.tiles
+    for index in board.players:
+        if index != LOST:
+            board.occupied |= 1 << index
+    return board, player
+
+
+class GameWriter:
+    """
+    Appends games to a file, one turn at a time. Only the game being written is kept in memory, and the board is
+    replayed as turns are added to check them and to take the snapshots.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = 32) -> None:
+        """
+        :param path: the file to append to, it is created if it does not exist
+        :param snapshot_interval: how many turns apart the snapshots are, the file keeps the interval it was created
+                                  with
+        """
+        if snapshot_interval <= 0:
+            raise ValueError('The snapshot interval must be positive')
+        self.path = path
+        self.file = open(path, 'ab+')
+        self.file.seek(0)
+        header = self.file.read(FILE_HEADER.size)
+        if header:
+            magic, version, self.snapshot_interval = FILE_HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                self.file.close()
+                raise ValueError(f'{path} is not a game record of version {VERSION}')
+        else:
+            self.snapshot_interval = snapshot_interval
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, snapshot_interval))
+        self.games = 0  # the games written since the file was opened
+        self.__board: Board | None = None
+        self.__player = 0
+        self.__starts: list[tuple[int, int]] = []
+        self.__packed = bytearray()
+        self.__snapshots = bytearray()
+        self.__num_actions = 0
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'GameWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def start_game(self, board: Board) -> None:
+        """Starts a game from a board with every bot placed and no tiles, the first player takes the first turn."""
+        if len(board.players) < 2:
+            raise ValueError('A game needs at least two players')
+        if board.tiles or LOST in board.players:
+            raise ValueError('A game must be started before any turns are taken')
+        self.__board = board.copy()
+        self.__player = 0
+        self.__starts = board.player_positions
+        self.__packed = bytearray()
+        self.__snapshots = bytearray()
+        self.__num_actions = 0
+
+    def add_action(self, action: int) -> None:
+        """Adds the next turn, the players who cannot move before it lose."""
+        if self.__board is None:
+            raise ValueError('No game has been started')
+        # the turn is played on a copy, so that the game is left as it was if the turn or the snapshot fails
+        board = self.__board.copy()
+        player = take_turn(board, self.__player, action)
+        snapshot = write_snapshot(board, player) if not (self.__num_actions + 1) % self.snapshot_interval else b''
+
+        self.__board, self.__player = board, player
+        if self.__num_actions & 1:
+            self.__packed[-1] |= action << 4
+        else:
+            self.__packed.append(action)
+        self.__num_actions += 1
+        self.__snapshots += snapshot
+
+    def end_game(self) -> None:
+        """Writes the game to the file."""
+        if self.__board is None:
+            raise ValueError('No game has been started')
+        board = self.__board
+        starts = b''.join(START.pack(*pos) for pos in self.__starts)
+        size = GAME_HEADER.size - 4 + len(starts) + len(self.__packed) + len(self.__snapshots)
+        self.file.write(GAME_HEADER.pack(size, board.width, board.height, len(self.__starts), self.__num_actions))
+        self.file.write(starts)
+        self.file.write(self.__packed)
+        self.file.write(self.__snapshots)
+        self.games += 1
+        self.__board = None
+
+    def write_game(self, board: Board, actions: list[int]) -> None:
+        """Writes a whole game, `board` is the board when the bots were placed."""
+        self.start_game(board)
+        for action in actions:
+            self.add_action(action)
+        self.end_game()
+
+
+class GameReader:
+    """Reads the games of a file one at a time, so files of any size can be replayed."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        magic, version, self.snapshot_interval = FILE_HEADER.unpack(self.file.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self.file.close()
+            raise ValueError(f'{path} is not a game record of version {VERSION}')
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'GameReader':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        self.file.seek(FILE_HEADER.size)
+        while (record := self.read()) is not None:
+            yield record
+
+    def offsets(self) -> Iterator[int]:
+        """Yields where each game starts in the file without reading the games, to find games with `read` later."""
+        offset = FILE_HEADER.size
+        self.file.seek(offset)
+        while len(size := self.file.read(4)) == 4:
+            yield offset
+            offset += 4 + int.from_bytes(size, 'little')
+            self.file.seek(offset)
+
+    def read(self, offset: int | None = None) -> GameRecord | None:
+        """Reads the game at an offset from `offsets`, the next game if None, and None at the end of the file."""
+        if offset is not None:
+            self.file.seek(offset)
+        header = self.file.read(GAME_HEADER.size)
+        if not header:
+            return None
+        if len(header) < GAME_HEADER.size:
+            raise ValueError(f'The last game of {self.path} is not complete')
+        size, width, height, num_players, num_actions = GAME_HEADER.unpack(header)
+        data = self.file.read(size - (GAME_HEADER.size - 4))
+        if len(data) < size - (GAME_HEADER.size - 4):
+            raise ValueError(f'The last game of {self.path} is not complete')
+        starts = [START.unpack_from(data, i * START.size) for i in range(num_players)]
+        offset = num_players * START.size
+        packed = data[offset:offset + (num_actions + 1) // 2]
+        snapshots = data[offset + len(packed):]
+        return GameRecord(width, height, starts, num_actions, packed, snapshots, self.snapshot_interval)
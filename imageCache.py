@@ -0,0 +1,75 @@
+"""
+A cache shared by every box for loading and scaling images
+"""
+from collections import OrderedDict
+import os
+import pygame
+
+
+class ImageCache:
+    """
+    Keeps images which were loaded from disk, along with the sizes they were scaled to, so that images are only loaded
+    when their file changes and only scaled when the size they are displayed at changes.
+    """
+
+    def __init__(self, max_scaled: int = 64) -> None:
+        """
+        :param max_scaled: the most scaled images that are kept at once
+        """
+        if max_scaled <= 0:
+            raise ValueError('The size of the image cache must be a positive number')
+        self.max_scaled = max_scaled
+        self.loads = 0  # times an image was loaded from disk
+        self.scales = 0  # times an image was scaled
+        # images for each path, along with the time the file was modified when it was loaded
+        self.__images: dict[str, tuple[float, pygame.surface.Surface]] = {}
+        # scaled images for each (path, time modified, available size, keep proportion, smooth scaling)
+        self.__scaled: OrderedDict[tuple, pygame.surface.Surface] = OrderedDict()
+
+    def load(self, path: str) -> pygame.surface.Surface:
+        """Returns the image at the path, loading it again only if the file was changed since it was loaded."""
+        modified = os.path.getmtime(path)
+        if path in self.__images and self.__images[path][0] == modified:
+            return self.__images[path][1]
+
+        self.loads += 1
+        image = pygame.image.load(path).convert_alpha()  # removing transparent parts of image
+        self.__images[path] = modified, image
+        return image
+
+    def scaled(self, path: str, available_size: tuple[int | float, int | float], keep_proportion: bool,
+               smooth: bool = False) -> pygame.surface.Surface:
+        """
+        Returns the image at the path scaled to fit in `available_size`.
+
+        :param keep_proportion: keeps the image in proportion when it is scaled
+        :param smooth: uses `pygame.transform.smoothscale`, which is slower but looks better
+        """
+        image = self.load(path)
+        key = (path, self.__images[path][0], tuple(available_size), keep_proportion, smooth)
+        if key in self.__scaled:
+            self.__scaled.move_to_end(key)  # most recently used images are at the end
+            return self.__scaled[key]
+
+        self.scales += 1
+        if keep_proportion:
+            scale_up = min(available_size[0] / image.get_width(), available_size[1] / image.get_height())
+            size = image.get_rect().scale_by(scale_up, scale_up).size
+        else:
+            size = available_size
+        scaled_image = (pygame.transform.smoothscale if smooth else pygame.transform.scale)(image, size)
+
+        self.__scaled[key] = scaled_image
+        if len(self.__scaled) > self.max_scaled:
+            self.__scaled.popitem(last=False)  # evicting the least recently used image
+        return scaled_image
+
+    def clear(self) -> None:
+        """Removes every image and resets the counters."""
+        self.__images.clear()
+        self.__scaled.clear()
+        self.loads = 0
+        self.scales = 0
+
+
+image_cache = ImageCache()  # the images shared by every box
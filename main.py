@@ -1,7 +1,9 @@
 from boxClass import Box, Justification, OverflowingOptions
-from screeenClass import Screen
+from frameStats import FrameStats
+from screenClass import Screen
 import pygame
 from sys import exit
+from time import perf_counter
 
 pygame.init()
 pygame.display.set_caption('Bots and Tiles')
@@ -25,6 +27,7 @@ intro_screen = Screen(
                   fill_in_border=True),
 )
 game_screen = Screen()
+intro_screen.load_fonts()
 # box = Box(screen, lambda x, y: (x / 10, y / 10), lambda x, y: (x / 2, y / 2),
 #           '<c:red,s:40,b,i>This_is_a_string </><c:blue>to test '
 #           '\nhow text is disp-\nlayed with the `Box` class</>'
@@ -38,12 +41,32 @@ game_screen = Screen()
 
 # constants
 FRAME_RATE = 24
+IDLE_FRAME_RATE = 4  # the frame rate when nothing is happening, set to FRAME_RATE to always run at the same rate
+IDLE_AFTER = FRAME_RATE  # how many frames without events before the frame rate is lowered
 BACKGROUND_COLOR = 'light gray'
+SHOW_FRAME_STATS = False  # draws the percentiles of the update and render times in the top left corner
+LOG_FRAME_STATS_EVERY = 0  # prints the percentiles every this many frames, 0 to never print them
+
+frame_stats = FrameStats()
 
 
 def main():
+    screen.fill(BACKGROUND_COLOR)
+    intro_screen.draw(BACKGROUND_COLOR)
+    game_screen.draw(BACKGROUND_COLOR)
+    pygame.display.update()
+    idle_frames = 0  # frames in a row without events
     while True:
-        for event in pygame.event.get():
+        # each frame handles every event which arrived since the last frame, then draws and flips the display once
+        if idle_frames < IDLE_AFTER:
+            events = pygame.event.get()
+        else:  # waiting for an event, but still drawing a frame at the idle frame rate
+            events = [event] if (event := pygame.event.wait(1000 // IDLE_FRAME_RATE)).type != pygame.NOEVENT else []
+            events += pygame.event.get()
+        idle_frames = 0 if events else idle_frames + 1
+
+        update_start = perf_counter()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 exit()
@@ -51,20 +74,48 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     pygame.quit()
                     exit()
-            update_screen(event)
-        clock.tick(FRAME_RATE)
+        resized = update_screen(events)
 
+        render_start = perf_counter()
+        render_screen(resized)
+        frame_stats.record(render_start - update_start, perf_counter() - render_start)
+        if LOG_FRAME_STATS_EVERY and frame_stats.frames % LOG_FRAME_STATS_EVERY == 0:
+            print(frame_stats.summary())
 
-def update_screen(event):
-    screen.fill(BACKGROUND_COLOR)
+        if idle_frames < IDLE_AFTER:
+            clock.tick(FRAME_RATE)
+
+
+def update_screen(events: list[pygame.event.Event]) -> bool:
+    """
+    Applies the events of one frame to the screens.
+
+    :return: whether the window was resized
+    """
+    # the whole window is drawn again when it is resized, otherwise only the areas which changed are drawn
+    resized = any(event.type == pygame.VIDEORESIZE for event in events)
+    if resized:
+        screen.fill(BACKGROUND_COLOR)
+        intro_screen.invalidate()
+        game_screen.invalidate()
 
     # box.update(event)
-    val = intro_screen.update(event)
+    val = intro_screen.update_many(events)
     if len(val):  # TODO: more logic for which box was pressed
         intro_screen.hide()
         game_screen.show()
+    return resized
 
-    pygame.display.update()
+
+def render_screen(resized: bool) -> None:
+    """Draws the screens and flips the parts of the display which changed."""
+    dirty_rects = intro_screen.draw(BACKGROUND_COLOR) + game_screen.draw(BACKGROUND_COLOR)
+    if SHOW_FRAME_STATS:
+        dirty_rects.append(frame_stats.draw_overlay(screen))
+    if resized:
+        pygame.display.update()
+    elif dirty_rects:
+        pygame.display.update(dirty_rects)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,106 @@
+"""
+Reading the tags of a box's text (see `Box`) into runs of text which share the same properties
+"""
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+
+
+properties_key = tuple[tuple[str, Any], ...]  # the default properties of text as the items of a dict
+
+# angle brackets with only whitespace between them join the lines around them, they are removed before reading tags
+CONTINUATION = re.compile(r'<[ \n]*>')
+# one piece of text each: a new line, an end tag, a tag with properties, or text without tags
+TOKEN = re.compile(r'(\n)|(</>)|<([^<>\n]*)>|([^<\n]+|<)')
+END_TAG = '</>'
+
+
+class StyledRun(NamedTuple):
+    """Text and the properties it is rendered with, the properties are shared and cannot be changed."""
+    text: str
+    properties: Mapping[str, Any]
+
+
+styled_lines = tuple[tuple[StyledRun, ...], ...]
+
+
+def parse_tag(contents: str) -> dict[str, Any]:
+    """Returns the properties set by the contents of a tag, such as "s: 20, c: blue, b"."""
+    properties = {}
+    for key_value_pair in contents.lower().replace(' ', '').split(','):  # `key_value_pair` is a string like 's:20'
+        key, _, value = key_value_pair.partition(':')
+        if not key:
+            continue
+        key = key[0]
+        if key == 'b' or key == 'i':
+            properties[key] = True  # bold or italic
+        elif key == 's':
+            properties[key] = int(value)  # size
+        else:
+            properties[key] = value.replace('-', ' ')  # color or font
+    return properties
+
+
+@lru_cache(maxsize=1024)
+def parse_markup(text: str, default_properties: properties_key) -> styled_lines:
+    """
+    Splits text into lines of runs with the properties set by their tags, in one pass over the text. The results are
+    cached, so boxes with the same text and default properties share them.
+
+    The text of a tag goes until its end tag on the same line, or until the end of the line if there is no end tag, in
+    which case the tag carries on to the following lines until an end tag. Text before a tag has the default
+    properties, and other text has the properties of a tag that carries on from an earlier line.
+
+    :param default_properties: the properties of text outside of tags, as `tuple(properties.items())`
+    :return: the runs of each line
+    """
+    defaults = dict(default_properties)
+    shared = {default_properties: MappingProxyType(defaults)}  # every run with the same properties uses one mapping
+
+    def frozen(properties: dict[str, Any]) -> Mapping[str, Any]:
+        key = tuple(properties.items())
+        if key not in shared:
+            shared[key] = MappingProxyType(properties)
+        return shared[key]
+
+    text = CONTINUATION.sub('', text)
+    default = shared[default_properties]
+    continued = default  # the properties of a tag which carries on from an earlier line
+    lines: list[tuple[StyledRun, ...]] = []
+    line: list[StyledRun] = []
+    pending: list[str] = []  # text without tags which has not been added to the line yet
+    position = 0
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        position = match.end()
+        new_line, end_tag, tag, plain = match.groups()
+        if plain is not None:
+            pending.append(plain)
+            continue
+
+        if pending:  # text before a tag has the default properties, other text has the carried on properties
+            line.append(StyledRun(''.join(pending), default if tag is not None else continued))
+            pending = []
+        if new_line is not None:
+            lines.append(tuple(line))
+            line = []
+        elif end_tag is not None:
+            continued = default
+        else:
+            properties = frozen(defaults | parse_tag(tag))
+            line_end = text.find('\n', position)
+            line_end = len(text) if line_end == -1 else line_end
+            end = text.find(END_TAG, position, line_end)
+            if end == -1:  # the tag carries on to the next lines
+                line.append(StyledRun(text[position:line_end], properties))
+                continued = properties
+                position = line_end
+            else:
+                line.append(StyledRun(text[position:end], properties))
+                position = end + len(END_TAG)
+
+    if pending:
+        line.append(StyledRun(''.join(pending), continued))
+    lines.append(tuple(line))
+    return tuple(lines)
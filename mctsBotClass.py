@@ -0,0 +1,259 @@
+"""
+A bot which chooses its turns with Monte Carlo tree search, which copes with many players better than alpha-beta
+"""
+from math import log, sqrt
+from random import Random
+from time import perf_counter
+from boardClass import Board, LOST
+from endgameSolver import EndgameSolver, TURN_BUDGET, solve_deadline
+from openingBook import OpeningBook
+
+
+FORFEIT = 16  # the action of a player who has nowhere to move, they lose and their bot becomes a tile
+# the directions set in each 4 bit mask of directions, so a random direction can be picked without building a list
+SET_DIRECTIONS = tuple(tuple(direction for direction in range(4) if mask >> direction & 1) for mask in range(16))
+
+
+class Node:
+    """A board in the search tree, reached by `player` taking `action` from the parent's board."""
+    __slots__ = 'parent', 'action', 'player', 'to_move', 'children', 'untried', 'visits', 'wins'
+
+    def __init__(self, parent: 'Node | None', action: int | None, player: int, to_move: int,
+                 untried: list[int]) -> None:
+        self.parent = parent
+        self.action = action
+        self.player = player  # the player who took the action, the wins are counted for them
+        self.to_move = to_move  # the player whose turn it is on this board
+        self.children: dict[int, Node] = {}
+        self.untried = untried  # the actions which do not have a child yet
+        self.visits = 0
+        self.wins = 0.
+
+
+class MCTSBot:
+    """
+    Chooses turns with Monte Carlo tree search: boards are picked with UCT, finished with random turns, and the
+    winner of each random game is counted along the path. The tree below the chosen turn is kept for the next turn.
+    """
+
+    def __init__(self, time_limit: float | None = .05, playouts: int | None = None, exploration: float = 1.4,
+                 seed: int | None = None, endgame: EndgameSolver | None = None,
+                 book: OpeningBook | None = None) -> None:
+        """
+        :param time_limit: how many seconds the bot can think for each turn, None to only use `playouts`
+        :param playouts: how many random games the bot plays each turn, None to only use `time_limit`
+        :param exploration: how much UCT favours boards which have been visited less
+        :param seed: the seed for the random games
+        :param endgame: solves the game once the bots are walled off, it can be shared between bots
+        :param book: the placements and first turns to play without searching
+        """
+        if time_limit is None and playouts is None:
+            raise ValueError('Either a time limit or a number of playouts is needed')
+        if (time_limit is not None and time_limit <= 0) or (playouts is not None and playouts <= 0):
+            raise ValueError('The time limit and the number of playouts must be positive')
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.exploration = exploration
+        self.random = Random(seed)
+        self.endgame = endgame if endgame is not None else EndgameSolver()
+        self.book = book
+
+        # statistics about the last turn
+        self.playouts_done = 0
+        self.seconds = 0.
+        self.reused_visits = 0  # visits of the tree which was kept from the turn before
+        self.__root: Node | None = None
+        self.__root_board: Board | None = None
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts_done / self.seconds if self.seconds else 0.
+
+    def summary(self) -> str:
+        """Describes the search of the last turn."""
+        return f'{self.playouts_done} playouts, {self.playouts_per_second:.0f} playouts/s'
+
+    def choose_start(self, board: Board, num_players: int | None = None) -> tuple[int, int]:
+        """
+        Chooses where to place the bot at the start of the game.
+
+        :param num_players: how many players the game has, the book's placements are only used if it is given
+        """
+        if self.book is not None and num_players is not None and \
+                (pos := self.book.placement(board, num_players)) is not None:
+            return pos
+        return board.start_position()
+
+    def choose_action(self, board: Board, player: int) -> int | None:
+        """
+        Chooses the turn the player takes.
+
+        :return: the turn encoded with `encode_action`, or None if the player has nowhere to move
+        """
+        start = perf_counter()
+        actions = board.actions(player)
+        if len(actions) <= 1:
+            self.__root = None
+            return actions[0] if actions else None
+        if (action := self.endgame.best_action(board, player, actions, TURN_BUDGET,
+                                               solve_deadline(start, self.time_limit))) is not None:
+            self.__root = None
+            return action  # the bot is walled off, so the best turn is known without searching
+        if self.book is not None and (action := self.book.action(board, player)) is not None:
+            self.__root = None
+            return action
+
+        root = self.reuse_tree(board, player)
+        self.reused_visits = root.visits
+        self.search(root, board, start + self.time_limit if self.time_limit is not None else None)
+        action = max(root.children.values(), key=lambda child: child.visits).action
+
+        # keeping the tree below the chosen turn for the next turn
+        self.__root = root.children[action]
+        self.__root.parent = None
+        self.__root_board = board.copy()
+        self.__root_board.play(player, action)
+        return action
+
+    def root_statistics(self, board: Board, player: int) -> dict[int, tuple[int, float]]:
+        """
+        Searches the board without choosing a turn.
+
+        :return: the visits and wins of each of the player's turns
+        """
+        root = self.reuse_tree(board, player)
+        self.search(root, board)
+        return {action: (child.visits, child.wins) for action, child in root.children.items()}
+
+    def reuse_tree(self, board: Board, player: int) -> Node:
+        """
+        Finds the board in the tree kept from the last turn by following the turns the other players took since then,
+        a new tree is started if it is not found.
+        """
+        if self.__root is not None:
+            target = board.occupied, board.tiles, board.players
+            found = self.find(self.__root, self.__root_board, target, len(board.players))
+            if found is not None and found.to_move == player:
+                found.parent = None
+                self.__root = None
+                return found
+        self.__root = None
+        return Node(None, None, LOST, player, board.actions(player) or [FORFEIT])
+
+    def find(self, node: Node, board: Board, target: tuple[int, int, list[int]], depth: int) -> Node | None:
+        if (board.occupied, board.tiles, board.players) == target:
+            return node
+        if depth == 0:
+            return None
+        for action, child in node.children.items():
+            child_board = board.copy()
+            self.apply(child_board, node.to_move, action)
+            found = self.find(child, child_board, target, depth - 1)
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def apply(board: Board, player: int, action: int) -> None:
+        if action == FORFEIT:
+            board.remove_player(player)
+        else:
+            board.play(player, action)
+
+    def search(self, root: Node, board: Board, deadline: float | None = None) -> None:
+        """
+        Plays random games from the root until the time limit or the number of playouts is reached.
+
+        :param deadline: the `perf_counter` time to stop at, `time_limit` after the search starts if None
+        """
+        start = perf_counter()
+        if deadline is None and self.time_limit is not None:
+            deadline = start + self.time_limit
+        playouts = 0
+        exploration = self.exploration
+        while True:
+            if self.playouts is not None and playouts >= self.playouts:
+                break
+            if deadline is not None and not playouts & 15 and perf_counter() >= deadline:
+                break
+            playouts += 1
+
+            # selecting a board with UCT, the tree is built while the board is copied down it
+            node = root
+            state = board.copy()
+            while not node.untried and node.children:
+                log_visits = log(node.visits)
+                node = max(node.children.values(), key=lambda child: child.wins / child.visits +
+                           exploration * sqrt(log_visits / child.visits))
+                self.apply(state, node.player, node.action)
+
+            # expanding one of the untried turns
+            if node.untried:
+                action = node.untried.pop(int(self.random.random() * len(node.untried)))
+                mover = node.to_move
+                self.apply(state, mover, action)
+                to_move = state.next_player(mover)
+                if state.players_left > 1:
+                    untried = state.actions(to_move) or [FORFEIT]
+                else:
+                    untried = []
+                child = Node(node, action, mover, to_move, untried)
+                node.children[action] = child
+                node = child
+
+            winner = self.playout(state, node.to_move) if state.players_left > 1 else state.next_player(node.to_move)
+
+            # counting the win for the player who took each turn on the path
+            while node is not None:
+                node.visits += 1
+                if node.player == winner:
+                    node.wins += 1
+                node = node.parent
+        self.playouts_done = playouts
+        self.seconds = perf_counter() - start
+
+    def playout(self, board: Board, player: int) -> int:
+        """
+        Plays random turns until one player is left, without changing the board.
+
+        :return: the winner
+        """
+        # everything is kept in local variables and integers to keep each turn fast
+        occupied = board.occupied
+        players = board.players[:]
+        left = len(players) - players.count(LOST)
+        stride = board.stride
+        offsets = board.direction_offsets
+        set_directions = SET_DIRECTIONS
+        random = self.random.random
+        num_players = len(players)
+        while True:
+            index = players[player]
+            if index != LOST:
+                around = ~occupied >> (index - stride)
+                moves = (around >> (stride + 1) & 1) | (around >> (2 * stride) & 1) << 1 | \
+                    (around >> (stride - 1) & 1) << 2 | (around & 1) << 3
+                if not moves:
+                    players[player] = LOST
+                    left -= 1
+                    if left == 1:
+                        break
+                else:
+                    directions = set_directions[moves]
+                    new_index = index + offsets[directions[int(random() * len(directions))]]
+                    occupied ^= 1 << index | 1 << new_index
+
+                    # the cell the bot left is free, so there is always somewhere to place a tile
+                    around = ~occupied >> (new_index - stride)
+                    placements = (around >> (stride + 1) & 1) | (around >> (2 * stride) & 1) << 1 | \
+                        (around >> (stride - 1) & 1) << 2 | (around & 1) << 3
+                    directions = set_directions[placements]
+                    occupied |= 1 << new_index + offsets[directions[int(random() * len(directions))]]
+                    players[player] = new_index
+            player += 1
+            if player == num_players:
+                player = 0
+        for player, index in enumerate(players):
+            if index != LOST:
+                return player
+        return LOST
@@ -0,0 +1,241 @@
+"""
+A book of the best placements and first turns for each board size, read from a memory-mapped file
+
+Building a book:
+    python openingBook.py openings.book --sizes 6x6 8x8 --plies 2 --time-limit .5
+"""
+import argparse
+import mmap
+import struct
+from random import Random
+from boardClass import Board
+from symmetry import ZobristKeys
+from territory import territory_counts
+
+
+MAGIC = b'BTOB'
+VERSION = 2
+HEADER = struct.Struct('<4sHBI')  # the magic, the version, the number of players, and the number of records
+RECORD = struct.Struct('<QH')  # the hash of a board and the placement or turn for it, records are sorted by hash
+MAX_PLAYERS = 8  # the most players a book can have boards for
+BOOK_SEED = 0x426f6f6b  # the seed of the Zobrist keys, books can only be read with the keys they were written with
+# mixed into the hash of a board with each number of bots on it
+BOT_COUNT_KEYS = tuple(Random(BOOK_SEED + count).getrandbits(64) for count in range(MAX_PLAYERS + 1))
+
+
+class OpeningBook:
+    """
+    The placements and turns for boards near the start of the game, looked up by a binary search of the file without
+    reading it into memory. Turned and flipped copies of a board share one record, which is stored for the copy with
+    the smallest hash (see `ZobristKeys`). Placements are chosen for the number of players the book was built for, so
+    they are only used in games with that many players.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: a book written by `OpeningBook.write`
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.__keys: dict[tuple[int, int], ZobristKeys] = {}
+        with open(path, 'rb') as file:
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.num_players, self.count = HEADER.unpack_from(self.__map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not an opening book of version {VERSION}')
+        if len(self.__map) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f'{path} is not complete')
+
+    def close(self) -> None:
+        self.__map.close()
+
+    def __enter__(self) -> 'OpeningBook':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, key: int) -> int | None:
+        """Returns the value stored for a hash, None if it is not in the book."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, value = RECORD.unpack_from(self.__map, HEADER.size + middle * RECORD.size)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def keys(self, board: Board) -> ZobristKeys:
+        """Returns the Zobrist keys for boards of the board's size, which are the same for every book."""
+        size = board.width, board.height
+        if size not in self.__keys:
+            self.__keys[size] = book_keys(board)
+        return self.__keys[size]
+
+    def placement(self, board: Board, num_players: int) -> tuple[int, int] | None:
+        """
+        Returns where the next player should place their bot, None if the board is not in the book.
+
+        :param num_players: how many players the game has, the book only has placements for `self.num_players`
+        """
+        if num_players != self.num_players or len(board.players) >= MAX_PLAYERS:
+            return None
+        keys = self.keys(board)
+        key, symmetry = canonical_key(keys, board, len(board.players))
+        cell = self.lookup(key)
+        if cell is None:
+            return None
+        pos = board.position(keys.symmetry.cells[keys.symmetry.inverses[symmetry]][cell])
+        return pos if board.is_free(pos) else None
+
+    def action(self, board: Board, player: int) -> int | None:
+        """Returns the turn the player should take, None if the board is not in the book."""
+        if len(board.players) > MAX_PLAYERS:
+            return None
+        keys = self.keys(board)
+        key, symmetry = canonical_key(keys, board, player)
+        action = self.lookup(key)
+        if action is None:
+            return None
+        action = keys.symmetry.action(keys.symmetry.inverses[symmetry], action)
+        return action if action in board.actions(player) else None
+
+    @staticmethod
+    def write(path: str, records: dict[int, int], num_players: int) -> None:
+        """
+        Writes a book of records from `canonical_key` hashes to canonical placements or turns.
+
+        :param num_players: the number of players the records were found for
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, num_players, len(records)))
+            for key in sorted(records):
+                file.write(RECORD.pack(key, records[key]))
+
+
+def book_keys(board: Board) -> ZobristKeys:
+    """Returns the keys for boards of the board's size, seeded by the size so boards of two sizes never match."""
+    return ZobristKeys(board.width, board.height, MAX_PLAYERS, BOOK_SEED ^ board.width << 32 ^ board.height << 48)
+
+
+def canonical_key(keys: ZobristKeys, board: Board, player: int) -> tuple[int, int]:
+    """
+    Returns the hash shared by every turned or flipped copy of the board when it is the player's turn, and the symmetry
+    it comes from. The number of bots on the board is mixed in, so boards with a different number of bots never match.
+    """
+    key, symmetry = keys.canonical(keys.hashes(board, player))
+    return key ^ BOT_COUNT_KEYS[len(board.players)], symmetry
+
+
+def best_placement(board: Board, num_players: int) -> tuple[int, int]:
+    """
+    Chooses where the next bot is placed by placing the bots after it with `Board.start_position`, then counting the
+    cells the bot reaches before any other bot.
+    """
+    player = len(board.players)
+    best, best_score = None, None
+    for y in range(board.height):
+        for x in range(board.width):
+            if not board.is_free((x, y)):
+                continue
+            placed = board.copy()
+            placed.add_player((x, y))
+            for _ in range(player + 1, num_players):
+                placed.add_player(placed.start_position())
+            counts = territory_counts(placed)
+            score = counts[player] - max(count for other, count in enumerate(counts) if other != player)
+            if best_score is None or score > best_score:
+                best, best_score = (x, y), score
+    return best
+
+
+def build(sizes: list[tuple[int, int]], num_players: int = 2, plies: int = 2, time_limit: float = .5,
+          progress: bool = False) -> dict[int, int]:
+    """
+    Finds the placements for every placement before the last, for every way the bots before could have been placed,
+    then searches the turns of the first `plies` turns after the bots are placed by the book.
+
+    :return: the records of the book
+    """
+    from searchBotClass import SearchBot  # imported here because the bots import the book
+
+    if not 2 <= num_players <= MAX_PLAYERS:
+        raise ValueError(f'The number of players must be from 2 to {MAX_PLAYERS}')
+    records = {}
+    for width, height in sizes:
+        keys = book_keys(Board(width, height))
+        symmetry = keys.symmetry
+
+        # placements, for each board with fewer than all of the bots placed, the first bot can be placed anywhere and
+        # the book's placements are followed after that
+        boards = [Board(width, height)]
+        book_line = Board(width, height)  # the board where every bot was placed by the book
+        for placed in range(num_players):
+            next_boards = {}
+            for board in boards:
+                key, board_symmetry = canonical_key(keys, board, placed)
+                pos = best_placement(board, num_players)
+                records[key] = symmetry.cells[board_symmetry][board.index(pos)]
+                positions = [(x, y) for y in range(height) for x in range(width) if board.is_free((x, y))] \
+                    if placed == 0 else [pos]
+                for other_pos in positions:
+                    after = board.copy()
+                    after.add_player(other_pos)
+                    next_boards.setdefault(canonical_key(keys, after, placed + 1)[0], after)
+            book_line.add_player(best_placement(book_line, num_players))
+            boards = list(next_boards.values()) if placed < num_players - 1 else []
+
+        # the first turns after the book's placements, for every turn the players could take
+        boards = [book_line]
+        bots = [SearchBot(time_limit) for _ in range(num_players)]  # each player's turns are searched by their own bot
+        player = 0
+        for ply in range(plies):
+            next_boards = {}
+            for board in boards:
+                action = bots[player].choose_action(board, player)
+                if action is None:
+                    continue
+                key, board_symmetry = canonical_key(keys, board, player)
+                records[key] = symmetry.action(board_symmetry, action)
+                for other_action in board.actions(player):
+                    after = board.copy()
+                    after.play(player, other_action)
+                    next_boards.setdefault(canonical_key(keys, after, after.next_player(player))[0], after)
+            if progress:
+                print(f'{width}x{height}: {len(boards)} boards searched at turn {ply + 1}')
+            boards = list(next_boards.values())
+            player = (player + 1) % num_players
+    return records
+
+
+def main() -> None:
+    def size(text: str) -> tuple[int, int]:
+        width, height = text.lower().split('x')
+        return int(width), int(height)
+
+    parser = argparse.ArgumentParser(description='Builds an opening book.')
+    parser.add_argument('path', help='where to write the book')
+    parser.add_argument('--sizes', nargs='+', type=size, default=[(8, 8)], help='board sizes, ex. 8x8')
+    parser.add_argument('--players', type=int, default=2, help='the number of players')
+    parser.add_argument('--plies', type=int, default=2, help='how many turns after the placements are in the book')
+    parser.add_argument('--time-limit', type=float, default=.5, help='seconds to search each turn for')
+    args = parser.parse_args()
+    records = build(args.sizes, args.players, args.plies, args.time_limit, progress=True)
+    OpeningBook.write(args.path, records, args.players)
+    print(f'{len(records)} boards written to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
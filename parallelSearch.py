@@ -0,0 +1,251 @@
+"""
+Bots which spread their search across a pool of processes, so that thinking is not limited to one core
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import perf_counter
+from boardClass import Board
+from endgameSolver import EndgameSolver, TURN_BUDGET, TURN_TIME_SHARE, solve_deadline
+from openingBook import OpeningBook
+from mctsBotClass import MCTSBot
+from searchBotClass import SearchBot
+
+
+# the bots of each worker process, kept between turns so that their transposition tables are reused
+worker_bots: dict[tuple, MCTSBot | SearchBot] = {}
+
+
+def mcts_worker(state: bytes, player: int, time_limit: float | None, playouts: int | None, exploration: float,
+                seed: int) -> tuple[dict[int, tuple[int, float]], int, float]:
+    """
+    Runs Monte Carlo tree search in a worker process.
+
+    :param state: the board stored with `Board.to_bytes`
+    :return: the visits and wins of each turn, the number of playouts, and how long they took
+    """
+    key = 'mcts', time_limit is None, playouts, exploration
+    bot = worker_bots.get(key)
+    if bot is None:
+        bot = worker_bots[key] = MCTSBot(time_limit, playouts, exploration)
+    bot.time_limit = time_limit  # the time left in the turn, which changes from turn to turn
+    bot.random.seed(seed)
+    statistics = bot.root_statistics(Board.from_bytes(state), player)
+    return statistics, bot.playouts_done, bot.seconds
+
+
+def alpha_beta_worker(state: bytes, player: int, actions: list[int], time_limit: float,
+                      max_depth: int) -> tuple[list[tuple[int, int]], int]:
+    """
+    Runs alpha-beta search over some of the player's turns in a worker process.
+
+    :param state: the board stored with `Board.to_bytes`
+    :return: the value and best turn of each depth which finished, and the number of boards searched
+    """
+    key = 'alpha-beta', max_depth
+    bot = worker_bots.get(key)
+    if bot is None:
+        bot = worker_bots[key] = SearchBot(time_limit, max_depth)
+    bot.time_limit = time_limit  # the time left in the turn, which changes from turn to turn
+    bot.choose_action(Board.from_bytes(state), player, actions)
+    return bot.depth_results, bot.nodes
+
+
+class ParallelBot:
+    """The pool of processes shared by the parallel bots, the pool is started on the first turn."""
+
+    def __init__(self, workers: int | None = None, executor: ProcessPoolExecutor | None = None,
+                 endgame: EndgameSolver | None = None, book: OpeningBook | None = None) -> None:
+        """
+        :param workers: how many processes to search with, the number of cores if None
+        :param executor: a pool shared with other bots, it is not shut down by `close`
+        :param endgame: solves the game once the bots are walled off, it can be shared between bots
+        :param book: the placements and first turns to play without searching
+        """
+        self.endgame = endgame if endgame is not None else EndgameSolver()
+        self.book = book
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        if self.workers <= 0:
+            raise ValueError('The number of workers must be a positive number')
+        self.__executor = executor
+        self.__owns_executor = executor is None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(self.workers)
+        return self.__executor
+
+    def close(self) -> None:
+        """Stops the worker processes."""
+        if self.__executor is not None and self.__owns_executor:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __enter__(self) -> 'ParallelBot':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def time_left(self, turn_start: float) -> float | None:
+        """
+        Returns how long the workers can search for in a turn which started at `turn_start`, at least the part of the
+        time limit that the endgame solver cannot use. None if the bot has no time limit.
+        """
+        if self.time_limit is None:
+            return None
+        return max(turn_start + self.time_limit - perf_counter(), self.time_limit * (1 - TURN_TIME_SHARE))
+
+    def choose_start(self, board: Board, num_players: int | None = None) -> tuple[int, int]:
+        """
+        Chooses where to place the bot at the start of the game.
+
+        :param num_players: how many players the game has, the book's placements are only used if it is given
+        """
+        if self.book is not None and num_players is not None and \
+                (pos := self.book.placement(board, num_players)) is not None:
+            return pos
+        return board.start_position()
+
+
+class ParallelMCTSBot(ParallelBot):
+    """
+    Root-parallel Monte Carlo tree search: every worker searches its own tree from the board with different random
+    games, and the visits and wins of each turn are added together.
+    """
+
+    def __init__(self, time_limit: float | None = .05, playouts: int | None = None, exploration: float = 1.4,
+                 workers: int | None = None, executor: ProcessPoolExecutor | None = None,
+                 seed: int | None = None, endgame: EndgameSolver | None = None,
+                 book: OpeningBook | None = None) -> None:
+        """
+        :param time_limit: how many seconds the bot can think for each turn, None to only use `playouts`
+        :param playouts: how many random games each worker plays each turn, None to only use `time_limit`
+        :param exploration: how much UCT favours boards which have been visited less
+        :param workers: how many processes to search with, the number of cores if None
+        :param executor: a pool shared with other bots, it is not shut down by `close`
+        :param seed: the seed for the seeds of the workers
+        :param endgame: solves the game once the bots are walled off, it can be shared between bots
+        :param book: the placements and first turns to play without searching
+        """
+        super().__init__(workers, executor, endgame, book)
+        if time_limit is None and playouts is None:
+            raise ValueError('Either a time limit or a number of playouts is needed')
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.exploration = exploration
+        self.random = Random(seed)
+
+        # statistics about the last turn
+        self.statistics: dict[int, tuple[int, float]] = {}  # the merged visits and wins of each turn
+        self.worker_playouts: list[int] = []
+        self.playouts_done = 0
+        self.seconds = 0.
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts_done / self.seconds if self.seconds else 0.
+
+    def summary(self) -> str:
+        """Describes the search of the last turn."""
+        return f'{self.playouts_done} playouts on {self.workers} workers, {self.playouts_per_second:.0f} playouts/s'
+
+    def choose_action(self, board: Board, player: int) -> int | None:
+        """
+        Chooses the turn the player takes.
+
+        :return: the turn encoded with `encode_action`, or None if the player has nowhere to move
+        """
+        turn_start = perf_counter()
+        actions = board.actions(player)
+        if len(actions) <= 1:
+            return actions[0] if actions else None
+        if (action := self.endgame.best_action(board, player, actions, TURN_BUDGET,
+                                               solve_deadline(turn_start, self.time_limit))) is not None:
+            return action  # the bot is walled off, so the best turn is known without searching
+        if self.book is not None and (action := self.book.action(board, player)) is not None:
+            return action
+
+        start = perf_counter()
+        state = board.to_bytes()
+        futures = [
+            self.executor.submit(mcts_worker, state, player, self.time_left(turn_start), self.playouts,
+                                 self.exploration, self.random.getrandbits(32))
+            for _ in range(self.workers)
+        ]
+        self.statistics = {}
+        self.worker_playouts = []
+        for future in futures:
+            statistics, playouts, _ = future.result()
+            self.worker_playouts.append(playouts)
+            for action, (visits, wins) in statistics.items():
+                total_visits, total_wins = self.statistics.get(action, (0, 0.))
+                self.statistics[action] = total_visits + visits, total_wins + wins
+        self.playouts_done = sum(self.worker_playouts)
+        self.seconds = perf_counter() - start
+        return max(self.statistics, key=lambda action: self.statistics[action][0])
+
+
+class ParallelSearchBot(ParallelBot):
+    """
+    Split-root alpha-beta search: the player's turns are split between the workers, and each worker searches its
+    turns with iterative deepening. The best turn is taken from the deepest search that every worker finished.
+    """
+
+    def __init__(self, time_limit: float = .05, max_depth: int = 64, workers: int | None = None,
+                 executor: ProcessPoolExecutor | None = None, endgame: EndgameSolver | None = None,
+                 book: OpeningBook | None = None) -> None:
+        """
+        :param time_limit: how many seconds the bot can think for each turn
+        :param max_depth: the most turns the bot looks ahead
+        :param workers: how many processes to search with, the number of cores if None
+        :param executor: a pool shared with other bots, it is not shut down by `close`
+        :param endgame: solves the game once the bots are walled off, it can be shared between bots
+        :param book: the placements and first turns to play without searching
+        """
+        super().__init__(workers, executor, endgame, book)
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+
+        # statistics about the last turn
+        self.worker_nodes: list[int] = []
+        self.nodes = 0
+        self.depth_reached = 0
+
+    def summary(self) -> str:
+        """Describes the search of the last turn."""
+        return f'searched {self.depth_reached} turns ahead, {self.nodes} boards on {self.workers} workers'
+
+    def choose_action(self, board: Board, player: int) -> int | None:
+        """
+        Chooses the turn the player takes.
+
+        :return: the turn encoded with `encode_action`, or None if the player has nowhere to move
+        """
+        turn_start = perf_counter()
+        actions = board.actions(player)
+        if len(actions) <= 1:
+            return actions[0] if actions else None
+        if (action := self.endgame.best_action(board, player, actions, TURN_BUDGET,
+                                               solve_deadline(turn_start, self.time_limit))) is not None:
+            return action  # the bot is walled off, so the best turn is known without searching
+        if self.book is not None and (action := self.book.action(board, player)) is not None:
+            return action
+
+        state = board.to_bytes()
+        futures = [
+            self.executor.submit(alpha_beta_worker, state, player, actions[i::self.workers],
+                                 self.time_left(turn_start), self.max_depth)
+            for i in range(min(self.workers, len(actions)))
+        ]
+        results = [future.result() for future in futures]
+        self.worker_nodes = [nodes for _, nodes in results]
+        self.nodes = sum(self.worker_nodes)
+
+        # the values of different depths cannot be compared, so only the depth every worker finished is used
+        self.depth_reached = min(len(depth_results) for depth_results, _ in results)
+        if not self.depth_reached:
+            return actions[0]
+        return max((depth_results[self.depth_reached - 1] for depth_results, _ in results),
+                   key=lambda result: result[0])[1]
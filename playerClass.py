@@ -1,27 +1,33 @@
+from boardClass import Board, DIRECTIONS
 from vector import Vector2d
 
 
 class Player:
-    def __init__(self, initial_position: 'Vector2d', board_size: 'Vector2d') -> None:
-        self.pos: 'Vector2d' = initial_position
-        self.board_size: 'Vector2d' = board_size
+    def __init__(self, initial_position: 'Vector2d', board: 'Board') -> None:
+        self.board: 'Board' = board
+        self.number: int = board.add_player(initial_position)  # the player's number on the board
 
-    def can_move(self, offset: 'Vector2d', obsticals) -> bool:
+    @classmethod
+    def on_board(cls, board: 'Board', number: int) -> 'Player':
+        """The player of a bot which is already on the board."""
+        player = cls.__new__(cls)
+        player.board = board
+        player.number = number
+        return player
+
+    @property
+    def pos(self) -> 'Vector2d':
+        return Vector2d(*self.board.player_position(self.number))
+
+    def can_move(self, offset: 'Vector2d') -> bool:
         """Can move in certain direction."""
-        changed_pos = self.pos + offset
-        if changed_pos in obsticals: return False
-        # out of bounds
-        if not (0 < changed_pos.x < self.board_size.x and 0 < changed_pos.y < self.board_size.y): return False
-        return True
+        return self.board.can_move(self.number, offset)
 
     @staticmethod
     def can_place(pos, tile_pos) -> bool:
         """Can place a tile down at entered position."""
-        if tuple(pos - tile_pos) in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
-            return True
-        return False
+        return Vector2d(*pos) - tile_pos in DIRECTIONS  # vectors are equal to tuples with the same values
 
     def move(self, offset: 'Vector2d') -> None:
         """Moves the player."""
-        self.pos += offset
-
+        self.board.move_player(self.number, self.board.direction(offset))
@@ -2,29 +2,158 @@
 A class to be a container for many boxes
 """
 import pygame.event
-from typing import Any
-from boxClass import Box
+from itertools import count
+from typing import Any, Iterable
+from boxClass import Box, BoxEvent
+from spatialGrid import SpatialGrid
+from textCache import font_cache
+
+
+MOUSE_EVENTS = {pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL}
+# events where only the last of several in a row needs to be handled
+COALESCED_EVENTS = {pygame.MOUSEMOTION, pygame.VIDEORESIZE}
+
+
+def coalesce_events(events: Iterable[pygame.event.Event]) -> list[pygame.event.Event]:
+    """Removes the events in `COALESCED_EVENTS` which are directly followed by another event of the same type."""
+    events = list(events)
+    return [
+        event for event, next_event in zip(events, events[1:] + [None])
+        if not (event.type in COALESCED_EVENTS and next_event is not None and next_event.type == event.type)
+    ]
 
 
 class Screen:
     __hidden = False
+    __cleared = True  # whether the boxes have been removed from the display since the screen was hidden
 
     def __init__(self, **boxes: 'Box') -> None:
+        """
+        :param boxes: the boxes on the screen, boxes should be added or removed afterwards using `add_box` and
+                    `remove_box` so that they are found when the mouse is over them
+        """
         self.boxes = dict(boxes)
+        self.__grid = SpatialGrid()  # where the boxes are, used to find the boxes under the mouse
+        self.__order: dict['Box', int] = {}  # the order the boxes are updated and drawn in
+        self.__next_order = count()
+        self.__active: set['Box'] = set()  # boxes which are hovered over or selected, they react when the mouse leaves
+        self.__routes: dict[int, list['Box']] = {}  # the boxes subscribed to each type of event, in order
+        for box in self.boxes.values():
+            self.__index(box)
+        self.route_events()
+
+    def add_box(self, name: str, box: 'Box') -> None:
+        if name in self.boxes:
+            self.remove_box(name)
+        self.boxes[name] = box
+        self.__index(box)
+        self.route_events()
+
+    def remove_box(self, name: str) -> 'Box':
+        box = self.boxes.pop(name)
+        self.__grid.remove(box)
+        self.__active.discard(box)
+        del self.__order[box]
+        self.route_events()
+        return box
+
+    def route_events(self) -> None:
+        """
+        Finds which boxes each type of event is given to, this needs to be called if the events a box is subscribed to
+        are changed after it was added to the screen.
+        """
+        self.__routes = {
+            box_event.value: [box for box in self.boxes.values() if box_event in box.subscribed_events]
+            for box_event in BoxEvent
+        }
+
+    def __index(self, box: 'Box') -> None:
+        self.__order[box] = next(self.__next_order)
+        self.__grid.insert(box, box.rect)
 
     def hide(self) -> None:
         self.__hidden = True
+        self.__cleared = False
 
     def show(self) -> None:
         self.__hidden = False
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Makes every box be drawn again, for example after the display was filled over."""
+        for box in self.boxes.values():
+            box.invalidate()
+
+    def load_fonts(self) -> None:
+        """Loads the fonts used by every box on the screen so that they are not loaded while the screen is shown."""
+        font_cache.warm_up(set().union(*(box.fonts_used() for box in self.boxes.values())))
 
     def update(self, event: pygame.event.Event) -> Any:
-        if self.__hidden:
+        """
+        Updates the boxes subscribed to the event. Mouse events only go to the boxes under the mouse and the boxes which
+        were hovered over or selected.
+
+        :return: the values returned by the boxes which were clicked on
+        """
+        if self.__hidden or not self.__routes.get(event.type):
             return []
+        mouse_pos = event.pos if hasattr(event, 'pos') else pygame.mouse.get_pos()  # retrieved once for every box
+        if event.type in MOUSE_EVENTS:
+            box_event = BoxEvent(event.type)
+            boxes = sorted(
+                (box for box in self.__grid.at(mouse_pos) | self.__active if box_event in box.subscribed_events),
+                key=self.__order.__getitem__
+            )
+        else:
+            boxes = self.__routes[event.type]
+
         outs = []
-        for name_box in self.boxes.items():
-            name, box = name_box
-            ret = box.update(event)
+        for box in boxes:
+            ret = box.update(event, mouse_pos)
             if ret is not None:
                 outs.append(ret)
+
+            # keeping track of the boxes which need to know when the mouse leaves them and of where the boxes are
+            if box.is_hovered_over or box.is_selected:
+                self.__active.add(box)
+            else:
+                self.__active.discard(box)
+            self.__grid.move(box, box.rect)
+        return outs
+
+    def update_many(self, events: Iterable[pygame.event.Event]) -> Any:
+        """
+        Updates the boxes with several events, for example all the events from one frame. Only the last of several
+        mouse movements or resizes in a row is handled.
+
+        :return: the values returned by the boxes which were clicked on
+        """
+        outs = []
+        for event in coalesce_events(events):
+            outs.extend(self.update(event))
         return outs
+
+    def draw(self, background_color: str | tuple) -> list[pygame.rect.Rect]:
+        """
+        Draws the boxes which have changed since they were last drawn, along with any boxes that overlap them.
+
+        :param background_color: the color drawn where boxes used to be
+        :return: the areas of the display which were changed, to be passed to `pygame.display.update`
+        """
+        if self.__hidden:
+            if self.__cleared:
+                return []
+            self.__cleared = True
+            return [area for box in self.boxes.values() if (area := box.clear(background_color)) is not None]
+
+        # removing the boxes which changed from where they were drawn
+        changed_areas = [
+            area for box in self.boxes.values() if box.needs_redraw and (area := box.clear(background_color)) is not None
+        ]
+
+        # drawing the boxes in order, so that boxes drawn over the changed areas are still in front of the boxes behind
+        for box in self.boxes.values():
+            if box.needs_redraw or box.drawn_area.collidelist(changed_areas) != -1:
+                changed_areas.append(box.draw())
+                self.__grid.move(box, box.rect)  # the text can change the size of the box when it is drawn
+        return changed_areas
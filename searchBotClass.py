@@ -0,0 +1,314 @@
+"""
+A bot which chooses its turns by searching the turns of every player with alpha-beta pruning
+"""
+from time import perf_counter
+from boardClass import Board, LOST
+from endgameSolver import EndgameSolver, TURN_BUDGET, solve_deadline
+from openingBook import OpeningBook
+from symmetry import ZobristKeys
+from territory import Territory, voronoi
+
+
+WIN = 1_000_000  # the value of a board where the bot won, boards where the bot lost are -WIN
+SEPARATED = 16  # how much more a cell counts once the bots are walled off, since the cells can no longer be taken
+LEAF_ENDGAME_BUDGET = 200  # the most boards the endgame solver looks at for each board at the end of the search
+# the most turns away a cell can be to count for the player who reaches it first, so that evaluating a board on a large
+# board does not flood the whole board
+VORONOI_DISTANCE = 16
+
+
+class SearchTimeout(Exception):
+    """Raised inside of the search once the time for a turn runs out."""
+
+
+class TranspositionTable:
+    """
+    A table of the values of boards that were already searched, with a fixed number of slots. When two boards need
+    the same slot, the board searched more deeply is kept unless the other board is from an earlier turn.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2  # whether the value is exact, or is a bound because of a cutoff
+
+    def __init__(self, size: int = 1 << 18) -> None:
+        """
+        :param size: the number of slots in the table
+        """
+        if size <= 0:
+            raise ValueError('The size of the transposition table must be a positive number')
+        self.size = size
+        self.generation = 0  # increased every turn, entries from earlier turns are replaced first
+        self.hits = 0
+        self.stores = 0
+        # each slot is (key, depth, value, flag, best action, generation)
+        self.__slots: list[tuple[int, int, int, int, int, int] | None] = [None] * size
+
+    def new_turn(self) -> None:
+        self.generation += 1
+
+    def get(self, key: int) -> tuple[int, int, int, int, int, int] | None:
+        entry = self.__slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, value: int, flag: int, action: int) -> None:
+        slot = key % self.size
+        entry = self.__slots[slot]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.stores += 1
+            self.__slots[slot] = key, depth, value, flag, action, self.generation
+
+    def clear(self) -> None:
+        self.__slots = [None] * self.size
+        self.hits = 0
+        self.stores = 0
+
+
+class SearchBot:
+    """
+    Chooses turns with a paranoid alpha-beta search: the bot assumes every other player is working against it, which
+    lets one alpha-beta search handle any number of players. The search deepens one turn at a time until the time for
+    the turn runs out, and uses the deepest search which finished.
+    """
+
+    def __init__(self, time_limit: float = .05, max_depth: int = 64, table_size: int = 1 << 18, seed: int = 0,
+                 endgame: EndgameSolver | None = None, symmetric: bool = True, book: OpeningBook | None = None) -> None:
+        """
+        :param time_limit: how many seconds the bot can think for each turn
+        :param max_depth: the most turns the bot looks ahead
+        :param table_size: the number of slots in the transposition table
+        :param seed: the seed for the Zobrist keys
+        :param endgame: solves the game once the bots are walled off, it can be shared between bots
+        :param symmetric: whether turned or flipped copies of a board share transposition table entries
+        :param book: the placements and first turns to play without searching
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.seed = seed
+        self.symmetric = symmetric
+        self.book = book
+        self.endgame = endgame if endgame is not None else EndgameSolver()
+        self.table = TranspositionTable(table_size)
+        self.nodes = 0  # boards searched during the last turn
+        self.depth_reached = 0  # the deepest search which finished during the last turn
+        self.depth_results: list[tuple[int, int]] = []  # the value and best turn of each search which finished
+        self.__keys: ZobristKeys | None = None
+        self.__deadline = 0.
+        self.__root = 0
+        self.__root_key = 0  # mixed into the keys of the transposition table, see `ZobristKeys.roots`
+        self.__board: Board | None = None
+        self.__territory: Territory | None = None
+
+    def summary(self) -> str:
+        """Describes the search of the last turn."""
+        return f'searched {self.depth_reached} turns ahead, {self.nodes} boards'
+
+    def choose_start(self, board: Board, num_players: int | None = None) -> tuple[int, int]:
+        """
+        Chooses where to place the bot at the start of the game.
+
+        :param num_players: how many players the game has, the book's placements are only used if it is given
+        """
+        if self.book is not None and num_players is not None and \
+                (pos := self.book.placement(board, num_players)) is not None:
+            return pos
+        return board.start_position()
+
+    def choose_action(self, board: Board, player: int, actions: list[int] | None = None) -> int | None:
+        """
+        Chooses the turn the player takes.
+
+        :param actions: the turns to choose from, all of the player's turns if None
+        :return: the turn encoded with `encode_action`, or None if the player has nowhere to move
+        """
+        start = perf_counter()
+        self.__deadline = start + self.time_limit  # the time spent getting ready counts toward the limit
+        self.depth_results = []
+        restricted = actions is not None  # the values are needed even when there is only one turn to choose from
+        if not restricted:
+            actions = board.actions(player)
+        if not actions:
+            return None
+        if len(actions) == 1 and not restricted:
+            return actions[0]
+        if not restricted and (action := self.endgame.best_action(board, player, actions, TURN_BUDGET,
+                                                                  solve_deadline(start, self.time_limit))) is not None:
+            return action  # the bot is walled off, so the best turn is known without searching
+        if not restricted and self.book is not None and (action := self.book.action(board, player)) is not None:
+            return action
+
+        if self.__keys is None or not self.__keys.fits(board):
+            self.__keys = ZobristKeys(board.width, board.height, len(board.players), self.seed, self.symmetric)
+            self.table.clear()
+        self.table.new_turn()
+        self.__root = player
+        self.__root_key = self.__keys.roots[player]
+        self.__board = board.copy()
+        self.__territory = Territory(self.__board)
+        self.nodes = 0
+        self.depth_reached = 0
+
+        best_action = actions[0]
+        hashes = self.__keys.hashes(self.__board, player)
+        try:
+            for depth in range(1, self.max_depth + 1):
+                value, action = self.search(depth, -WIN - 1, WIN + 1, player, hashes, actions)
+                best_action = action
+                self.depth_reached = depth
+                self.depth_results.append((value, action))
+                if abs(value) >= WIN - self.max_depth:  # the result of the game is known
+                    break
+        except SearchTimeout:
+            pass
+        return best_action
+
+    def search(self, depth: int, alpha: int, beta: int, player: int, hashes: list[int],
+               actions: list[int] | None = None) -> tuple[int, int | None]:
+        """
+        Searches the turns from the board, with the root player maximising the value and the others minimising it.
+
+        :param hashes: the hashes of the board under each symmetry, see `ZobristKeys`
+        :param actions: the turns to search, all of the player's turns if None
+        :return: the value of the board and the best turn for the player
+        """
+        self.nodes += 1
+        if not self.nodes & 127 and perf_counter() > self.__deadline:
+            raise SearchTimeout
+        board = self.__board
+        root = self.__root
+
+        # the game is over
+        if board.players[root] == LOST:
+            return -WIN + self.max_depth - depth, None
+        if board.players_left == 1:
+            return WIN - self.max_depth + depth, None
+        if depth == 0:
+            if perf_counter() > self.__deadline:  # evaluating a board takes much longer than checking the time
+                raise SearchTimeout
+            return self.evaluate(player), None
+
+        # turned or flipped copies of the board share an entry, where the turn is stored turned or flipped to match,
+        # and searches for different players do not share entries
+        keys = self.__keys
+        key, symmetry = keys.canonical(hashes)
+        key ^= self.__root_key
+        original_alpha, original_beta = alpha, beta
+        entry = self.table.get(key)
+        tt_action = None
+        if entry is not None:
+            tt_action = keys.symmetry.action(keys.symmetry.inverses[symmetry], entry[4])
+            if actions is not None and tt_action not in actions:
+                tt_action = None
+            elif entry[1] >= depth:
+                value, flag = entry[2], entry[3]
+                if flag == TranspositionTable.EXACT:
+                    return value, tt_action
+                if flag == TranspositionTable.LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, tt_action
+
+        maximising = player == root
+        index = board.players[player]
+        occupied, tiles = board.occupied, board.tiles
+        next_player = board.next_player(player)
+        turn_key = keys.turns[player] ^ keys.turns[next_player]
+
+        if actions is None:
+            actions = board.actions(player)
+        if not actions:  # the player loses, their bot becomes a tile
+            board.remove_player(player)
+            next_player = board.next_player(player)
+            turn_key = keys.turns[player] ^ keys.turns[next_player]
+            value, _ = self.search(depth - 1, alpha, beta, next_player, [
+                key ^ bot_keys[player][index] ^ tile_keys[index] ^ turn_key
+                for key, bot_keys, tile_keys in zip(hashes, keys.bots, keys.tiles)
+            ])
+            board.players[player] = index
+            board.occupied, board.tiles = occupied, tiles
+            return value, None
+
+        actions = self.order_actions(actions, player, tt_action)
+        best_value = -WIN - 1 if maximising else WIN + 1
+        best_action = actions[0]
+        offsets = board.direction_offsets
+        for action in actions:
+            new_index = index + offsets[action >> 2]
+            tile = new_index + offsets[action & 3]
+            board.play(player, action)
+            value, _ = self.search(depth - 1, alpha, beta, next_player, [
+                key ^ bot_keys[player][index] ^ bot_keys[player][new_index] ^ tile_keys[tile] ^ turn_key
+                for key, bot_keys, tile_keys in zip(hashes, keys.bots, keys.tiles)
+            ])
+            board.players[player] = index
+            board.occupied, board.tiles = occupied, tiles
+
+            if maximising:
+                if value > best_value:
+                    best_value, best_action = value, action
+                alpha = max(alpha, value)
+            else:
+                if value < best_value:
+                    best_value, best_action = value, action
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            flag = TranspositionTable.UPPER
+        elif best_value >= original_beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self.table.store(key, depth, best_value, flag, keys.symmetry.action(symmetry, best_action))
+        return best_value, best_action
+
+    def order_actions(self, actions: list[int], player: int, first: int | None) -> list[int]:
+        """
+        Orders the turns so that the turns most likely to be best are searched first: the best turn found by an earlier
+        search, then the turns which leave the player's bot with the most room to move.
+        """
+        board = self.__board
+        index = board.players[player]
+        offsets = board.direction_offsets
+
+        def mobility(action: int) -> int:
+            new_index = index + offsets[action >> 2]
+            tile = new_index + offsets[action & 3]
+            occupied = board.occupied ^ (1 << index | 1 << new_index) | 1 << tile
+            around = ~occupied >> (new_index - board.stride)
+            stride = board.stride
+            return (around >> (stride + 1) & 1) + (around >> (2 * stride) & 1) + (around >> (stride - 1) & 1) + \
+                (around & 1)
+
+        ordered = sorted(actions, key=mobility, reverse=True)
+        if first in actions:
+            ordered.remove(first)
+            ordered.insert(0, first)
+        return ordered
+
+    def evaluate(self, player: int) -> int:
+        """
+        Returns how good the board is for the root player: the number of free cells within `VORONOI_DISTANCE` turns
+        which its bot reaches before any other bot, minus the most that any other player reaches first. Once the root
+        player's bot is walled off from the others, the cells it can still reach are compared instead, and once every
+        bot is walled off the game is solved.
+
+        :param player: the player whose turn it is
+        """
+        board = self.__board
+        territory = self.__territory
+        territory.update(board)  # only the cells which changed since the last board that was evaluated are updated
+        root = self.__root
+        if territory.is_separated(board, root):
+            losing_order = self.endgame.outcome(board, player, LEAF_ENDGAME_BUDGET, self.__deadline)
+            if losing_order is not None:
+                return WIN - self.max_depth if losing_order[-1] == root else -WIN + self.max_depth
+            root_cells = territory.reachable(board, root).bit_count()
+            best_other = max(territory.reachable(board, player).bit_count()
+                             for player, index in enumerate(board.players) if index != LOST and player != root)
+            return SEPARATED * (root_cells - best_other)
+        counts = [cells.bit_count() for cells in voronoi(board, VORONOI_DISTANCE)]
+        return counts[root] - max(count for player, count in enumerate(counts) if player != root)
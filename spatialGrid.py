@@ -0,0 +1,64 @@
+"""
+A uniform grid for finding which items cover a point without checking every item
+"""
+from typing import Any, Hashable
+import pygame
+
+
+class SpatialGrid:
+    """
+    Splits the display into square cells and remembers which cells each item's rect covers, so that finding the items
+    under a point only looks at the items in one cell.
+    """
+
+    def __init__(self, cell_size: int = 64) -> None:
+        """
+        :param cell_size: the width and height of each cell of the grid
+        """
+        if cell_size <= 0:
+            raise ValueError('The size of a cell must be a positive number')
+        self.cell_size = cell_size
+        self.__cells: dict[tuple[int, int], set[Hashable]] = {}  # the items in each cell
+        self.__rects: dict[Hashable, pygame.rect.Rect] = {}  # the rect each item was indexed with
+
+    def insert(self, item: Hashable, rect: pygame.rect.Rect) -> None:
+        """Adds an item covering `rect` to the grid, replacing where it was if it was already in the grid."""
+        if item in self.__rects:
+            self.remove(item)
+        rect = pygame.rect.Rect(rect)
+        self.__rects[item] = rect
+        for cell in self.covered_cells(rect):
+            self.__cells.setdefault(cell, set()).add(item)
+
+    def remove(self, item: Hashable) -> None:
+        """Removes an item from the grid."""
+        for cell in self.covered_cells(self.__rects.pop(item)):
+            self.__cells[cell].discard(item)
+            if not self.__cells[cell]:
+                del self.__cells[cell]
+
+    def move(self, item: Hashable, rect: pygame.rect.Rect) -> None:
+        """Updates where an item is if its rect changed since it was indexed."""
+        if self.__rects.get(item) != rect:
+            self.insert(item, rect)
+
+    def at(self, pos: tuple[int | float, int | float]) -> set[Any]:
+        """Returns the items whose rects cover the position."""
+        cell = int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)
+        return {item for item in self.__cells.get(cell, ()) if self.__rects[item].collidepoint(pos)}
+
+    def covered_cells(self, rect: pygame.rect.Rect) -> list[tuple[int, int]]:
+        """Returns the cells that the rect covers."""
+        if not rect.width or not rect.height:
+            return []
+        return [
+            (x, y)
+            for x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1)
+            for y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1)
+        ]
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.__rects
+
+    def __len__(self) -> int:
+        return len(self.__rects)
@@ -0,0 +1,118 @@
+"""
+Turning and flipping boards, so that boards which are turned or flipped copies of each other are treated as one board
+"""
+from random import Random
+from boardClass import Board, DIRECTIONS, LOST
+
+
+# the ways of turning or flipping a board onto itself, as functions of (x, y, width, height), the first four keep the
+# width and height so they work on any board, the last four swap them so they only work on square boards
+SYMMETRIES = (
+    lambda x, y, w, h: (x, y),
+    lambda x, y, w, h: (w - 1 - x, y),
+    lambda x, y, w, h: (x, h - 1 - y),
+    lambda x, y, w, h: (w - 1 - x, h - 1 - y),
+    lambda x, y, w, h: (y, x),
+    lambda x, y, w, h: (h - 1 - y, x),
+    lambda x, y, w, h: (y, w - 1 - x),
+    lambda x, y, w, h: (h - 1 - y, w - 1 - x),
+)
+INVERSES = (0, 1, 2, 3, 4, 6, 5, 7)  # the symmetry which undoes each symmetry, only the quarter turns undo each other
+
+
+class BoardSymmetry:
+    """Where the cells and directions of a board of one size go under each way of turning or flipping it."""
+
+    def __init__(self, width: int, height: int) -> None:
+        board = Board(width, height)
+        symmetries = SYMMETRIES if width == height else SYMMETRIES[:4]
+        self.size = board.size
+
+        # the cell each cell goes to, border cells stay where they are
+        self.cells: list[list[int]] = []
+        # the direction each direction goes to
+        self.directions: list[tuple[int, ...]] = []
+        for symmetry in symmetries:
+            # the cell a position goes to changes by the same amount for each step right or down, so each row of
+            # cells goes to a range of cells
+            origin = board.index(symmetry(0, 0, width, height))
+            right = board.index(symmetry(1, 0, width, height)) - origin
+            down = board.index(symmetry(0, 1, width, height)) - origin
+            cells = list(range(board.size))
+            for y in range(height):
+                start = origin + y * down
+                row = board.index((0, y))
+                cells[row:row + width] = range(start, start + right * width, right)
+            self.cells.append(cells)
+            origin = symmetry(0, 0, width, height)
+            self.directions.append(tuple(
+                DIRECTIONS.index((moved[0] - origin[0], moved[1] - origin[1]))
+                for moved in (symmetry(dx, dy, width, height) for dx, dy in DIRECTIONS)
+            ))
+        self.inverses = list(INVERSES[:len(symmetries)])  # the symmetry which undoes each symmetry
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def action(self, symmetry: int, action: int) -> int:
+        """Returns where a turn encoded with `encode_action` goes under a symmetry."""
+        directions = self.directions[symmetry]
+        return directions[action >> 2] << 2 | directions[action & 3]
+
+
+class ZobristKeys:
+    """
+    Random numbers for each thing which can be on a cell, a board is hashed by XORing the numbers of everything on it.
+    Changing the board only needs the numbers of the cells that changed to be XORed into the hash.
+
+    A hash is kept for each way of turning or flipping the board, where the numbers of each cell are the numbers of the
+    cell it goes to. Turned or flipped copies of a board have the same hashes in a different order, so the smallest
+    hash is the same for all of them.
+    """
+
+    def __init__(self, width: int, height: int, num_players: int, seed: int = 0, symmetric: bool = True) -> None:
+        """
+        :param num_players: the number of players
+        :param symmetric: whether to keep a hash for each symmetry, otherwise only the board as it is is hashed
+        """
+        self.width = width
+        self.height = height
+        self.num_players = num_players
+        self.symmetry = BoardSymmetry(width, height)
+        random = Random(seed)
+        size = self.symmetry.size
+        tiles = [random.getrandbits(64) for _ in range(size)]
+        bots = [[random.getrandbits(64) for _ in range(size)] for _ in range(num_players)]
+        self.turns = [random.getrandbits(64) for _ in range(num_players)]  # whose turn it is
+        # the player a search is for, since the values a search stores are only right for the player it is for
+        self.roots = [random.getrandbits(64) for _ in range(num_players)]
+
+        cells = self.symmetry.cells if symmetric else self.symmetry.cells[:1]
+        self.tiles = [[tiles[moved] for moved in symmetry] for symmetry in cells]
+        self.bots = [[[keys[moved] for moved in symmetry] for keys in bots] for symmetry in cells]
+
+    def fits(self, board: Board) -> bool:
+        """Whether the keys are for boards like the board."""
+        return (board.width, board.height, len(board.players)) == (self.width, self.height, self.num_players)
+
+    def hashes(self, board: Board, player: int) -> list[int]:
+        """Returns the hash of the board under each symmetry when it is the player's turn."""
+        hashes = []
+        for tile_keys, bot_keys in zip(self.tiles, self.bots):
+            key = self.turns[player]
+            tiles = board.tiles
+            while tiles:
+                lowest = tiles & -tiles
+                key ^= tile_keys[lowest.bit_length() - 1]
+                tiles ^= lowest
+            for bot, index in enumerate(board.players):
+                if index != LOST:
+                    key ^= bot_keys[bot][index]
+            hashes.append(key)
+        return hashes
+
+    @staticmethod
+    def canonical(hashes: list[int]) -> tuple[int, int]:
+        """Returns the hash shared by every turned or flipped copy of the board, and the symmetry it comes from."""
+        key = min(hashes)
+        return key, hashes.index(key)
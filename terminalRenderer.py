@@ -0,0 +1,168 @@
+"""
+Drawing the board in a terminal, writing only the cells which changed since the board was last drawn
+"""
+import shutil
+import sys
+from typing import TextIO
+from boardClass import Board, LOST
+
+
+EMPTY_TILE = '-'
+FILLED_TILE = 'X'
+CLEAR_SCREEN = '\x1b[2J\x1b[H'
+SAVE_CURSOR = '\x1b7'
+RESTORE_CURSOR = '\x1b8'
+RESET_SCROLLING = '\x1b[r'
+
+
+def move_cursor(row: int, column: int) -> str:
+    """Moves the cursor to a row and column, both counted from 1."""
+    return f'\x1b[{row};{column}H'
+
+
+class TerminalRenderer:
+    """
+    Draws boards in a terminal, keeping what each cell showed so that later boards only write the cells that changed.
+
+    In a terminal the board is drawn once at the top, and the text printed after it scrolls below it. The changed
+    cells are written in place by moving the cursor to them with ANSI escape codes. When the output is not a terminal,
+    or the board does not fit on it, the whole board is printed again, but only when something changed.
+    """
+
+    def __init__(self, size: int = 0, render: bool = True, stream: TextIO | None = None,
+                 ansi: bool | None = None) -> None:
+        """
+        :param size: how many characters wide each cell is drawn inside of its border, 0 for one character without
+                     borders
+        :param render: whether to draw anything, False for games without a display
+        :param stream: where to draw the board, the standard output if None
+        :param ansi: whether to write changed cells in place, found from whether the stream is a terminal if None
+        """
+        if size < 0 or not isinstance(size, int):
+            raise ValueError('The size of a cell must be a natural number or zero')
+        self.size = size
+        self.render = render
+        self.stream = stream if stream is not None else sys.stdout
+        self.ansi = ansi if ansi is not None else self.stream.isatty()
+        self.characters_written = 0
+        self.__frame: list[str] = []  # what each cell showed, row by row
+        self.__width = self.__height = 0
+        self.__occupied = self.__tiles = 0
+        self.__bots: dict[int, str] = {}  # the number shown on each cell with a bot on it
+        self.__in_place = False  # whether the board is at the top of the terminal, so cells can be written in place
+
+    @property
+    def cell_height(self) -> int:
+        return max(self.size // 2, 1) if self.size else 1
+
+    @property
+    def lines(self) -> int:
+        """The number of lines the board takes up."""
+        return self.__height * (self.cell_height + 1) + 1 if self.size else self.__height
+
+    def symbol(self, board: Board, index: int, bots: dict[int, str]) -> str:
+        """Returns what a cell shows: the number of the bot on it, a tile, or nothing."""
+        return bots.get(index) or (FILLED_TILE if board.tiles >> index & 1 else EMPTY_TILE)
+
+    def cell_lines(self, symbol: str) -> list[str]:
+        """Returns the lines inside of a cell's border which show a symbol."""
+        if not self.size:
+            return [symbol]
+        if symbol == FILLED_TILE:
+            return [FILLED_TILE * self.size] * self.cell_height
+        middle = symbol.center(self.size)[:self.size] if symbol != EMPTY_TILE else ' ' * self.size
+        lines = [' ' * self.size] * self.cell_height
+        lines[(self.cell_height - 1) // 2] = middle
+        return lines
+
+    def frame_lines(self) -> list[str]:
+        """Returns every line of the board as it was last drawn."""
+        rows = [self.__frame[y * self.__width:(y + 1) * self.__width] for y in range(self.__height)]
+        if not self.size:
+            return [''.join(row) for row in rows]
+        border = '+' + ('-' * self.size + '+') * self.__width
+        lines = [border]
+        for row in rows:
+            cells = [self.cell_lines(symbol) for symbol in row]
+            lines.extend('|' + '|'.join(cell[line] for cell in cells) + '|' for line in range(self.cell_height))
+            lines.append(border)
+        return lines
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+        self.characters_written += len(text)
+
+    def draw(self, board: Board) -> None:
+        """Draws the board, only writing the cells which changed since the last board if it is the same size."""
+        if not self.render:
+            return
+        bots = {index: str(player + 1) for player, index in enumerate(board.players) if index != LOST}
+        if (board.width, board.height) != (self.__width, self.__height):
+            self.__width, self.__height = board.width, board.height
+            self.__frame = [self.symbol(board, board.index((x, y)), bots)
+                            for y in range(board.height) for x in range(board.width)]
+            self.remember(board, bots)
+            self.draw_frame(clear=True)
+            return
+
+        # only the cells whose bits or bots changed need to be checked
+        changed = (board.occupied ^ self.__occupied | board.tiles ^ self.__tiles) & board.board_mask
+        for index in self.__bots.keys() | bots.keys():
+            if self.__bots.get(index) != bots.get(index):
+                changed |= 1 << index
+        self.remember(board, bots)
+        updates = []
+        while changed:
+            lowest = changed & -changed
+            index = lowest.bit_length() - 1
+            changed ^= lowest
+            x, y = board.position(index)
+            symbol = self.symbol(board, index, bots)
+            if self.__frame[y * board.width + x] != symbol:
+                self.__frame[y * board.width + x] = symbol
+                updates.append((x, y, symbol))
+        if not updates:
+            return
+        if not self.__in_place:
+            self.draw_frame()
+            return
+
+        text = [SAVE_CURSOR]
+        for x, y, symbol in updates:
+            if self.size:
+                row, column = y * (self.cell_height + 1) + 2, x * (self.size + 1) + 2
+            else:
+                row, column = y + 1, x + 1
+            for line, cell_line in enumerate(self.cell_lines(symbol)):
+                text.append(move_cursor(row + line, column) + cell_line)
+        text.append(RESTORE_CURSOR)
+        self.write(''.join(text))
+
+    def remember(self, board: Board, bots: dict[int, str]) -> None:
+        self.__occupied = board.occupied
+        self.__tiles = board.tiles
+        self.__bots = bots
+
+    def draw_frame(self, clear: bool = False) -> None:
+        """
+        Writes the whole board. In a terminal the board is put at the top and only the lines below it scroll, otherwise
+        it is printed like any other text.
+
+        :param clear: whether the board is new, which is when a terminal is cleared
+        """
+        lines = self.frame_lines()
+        if self.ansi and (clear or self.__in_place):
+            terminal_lines = shutil.get_terminal_size().lines
+            self.__in_place = len(lines) + 2 <= terminal_lines
+            if self.__in_place:
+                self.write(RESET_SCROLLING + CLEAR_SCREEN + '\n'.join(lines) +
+                           f'\x1b[{len(lines) + 2};{terminal_lines}r' + move_cursor(len(lines) + 2, 1))
+                return
+        self.write('\n'.join(lines) + '\n\n')
+
+    def close(self) -> None:
+        """Lets the whole terminal scroll again."""
+        if self.__in_place:
+            self.write(RESET_SCROLLING + move_cursor(shutil.get_terminal_size().lines, 1) + '\n')
+            self.__in_place = False
@@ -0,0 +1,176 @@
+"""
+Finding which free cells each player can reach, working on whole bitboards (see `Board`) at once instead of cell by cell
+"""
+from boardClass import Board, LOST
+
+
+def expand(cells: int, stride: int) -> int:
+    """Returns the cells and every cell next to them, the caller masks out the cells that cannot be entered."""
+    return cells | cells << 1 | cells >> 1 | cells << stride | cells >> stride
+
+
+def flood(start: int, within: int, stride: int) -> int:
+    """Returns every cell of `within` connected to the `start` cells, the start cells must be part of `within`."""
+    reached = start
+    while True:
+        grown = expand(reached, stride) & within
+        if grown == reached:
+            return reached
+        reached = grown
+
+
+def neighbours(index: int, stride: int) -> int:
+    """Returns the four cells next to a cell."""
+    return 1 << index + 1 | 1 << index - 1 | 1 << index + stride | 1 << index - stride
+
+
+def voronoi(board: Board, max_distance: int | None = None) -> list[int]:
+    """
+    Splits the free cells between the players: each cell goes to the player whose bot can reach it first, cells two
+    bots reach at the same time go to nobody.
+
+    :param max_distance: the most turns away a cell can be to be given to a player, every cell if None
+    :return: the cells of each player, 0 for players who lost
+    """
+    stride = board.stride
+    free = board.board_mask & ~board.occupied
+    fronts = [0 if index == LOST else 1 << index for index in board.players]
+    owned = [0] * len(fronts)
+    claimed = ~free
+    distance = 0
+    while any(fronts) and distance != max_distance:
+        distance += 1
+        seen = 0
+        contested = 0
+        for player, front in enumerate(fronts):
+            if front:
+                front = expand(front, stride) & ~claimed
+                fronts[player] = front
+                contested |= seen & front
+                seen |= front
+        claimed |= seen
+        for player, front in enumerate(fronts):
+            owned[player] |= front & ~contested  # contested cells still spread, the cells past them are as far away
+    return owned
+
+
+def territory_counts(board: Board) -> list[int]:
+    """Returns how many cells each player reaches before every other player."""
+    return [cells.bit_count() for cells in voronoi(board)]
+
+
+def locally_connected(index: int, region: int, stride: int) -> bool:
+    """
+    Whether the cells of the region next to a cell are connected through the eight cells around it, in which case
+    filling the cell cannot split the region.
+    """
+    # the cells around the cell in order, starting above it, the cells next to it are at even positions
+    ring = [region >> index + offset & 1 for offset in (-stride, 1 - stride, 1, stride + 1, stride, stride - 1, -1,
+                                                         -stride - 1)]
+    if all(ring):
+        return True
+    start = ring.index(0)
+    groups = 0  # the runs of free cells around the cell which have a cell next to it
+    counted = False  # whether the run being walked has been counted
+    for position in range(start + 1, start + 9):
+        position %= 8
+        if not ring[position]:
+            counted = False
+        elif not position % 2 and not counted:
+            groups += 1
+            counted = True
+    return groups <= 1
+
+
+class Territory:
+    """
+    The regions of connected free cells on a board, kept up to date as cells are filled and emptied. Only the region
+    around a changed cell is flooded again, rather than the whole board.
+    """
+
+    def __init__(self, board: Board) -> None:
+        self.stride = board.stride
+        self.board_mask = board.board_mask
+        self.free = self.board_mask & ~board.occupied
+        self.regions: list[int] = []
+        self.floods = 0  # how many regions have been flooded to check whether they split
+        free = self.free
+        while free:  # flooding each region once, rather than adding the free cells one at a time
+            region = flood(free & -free, free, self.stride)
+            self.regions.append(region)
+            free &= ~region
+
+    def update(self, board: Board) -> None:
+        """Updates the regions to the cells which are free on the board."""
+        free = self.board_mask & ~board.occupied
+        emptied = free & ~self.free
+        filled = self.free & ~free
+        self.free = free
+        while emptied:
+            lowest = emptied & -emptied
+            self.empty(lowest.bit_length() - 1)
+            emptied ^= lowest
+        while filled:
+            lowest = filled & -filled
+            self.fill(lowest.bit_length() - 1)
+            filled ^= lowest
+
+    def empty(self, index: int) -> None:
+        """A cell became free, joining the regions next to it."""
+        around = neighbours(index, self.stride)
+        joined = 1 << index
+        regions = []
+        for region in self.regions:
+            if region & around:
+                joined |= region
+            else:
+                regions.append(region)
+        regions.append(joined)
+        self.regions = regions
+
+    def fill(self, index: int) -> None:
+        """A cell was filled, which can split its region in up to four regions."""
+        bit = 1 << index
+        for i, region in enumerate(self.regions):
+            if region & bit:
+                break
+        else:
+            return
+        region ^= bit
+        around = neighbours(index, self.stride) & region
+        if not region:
+            del self.regions[i]
+            return
+        if not around & around - 1 or locally_connected(index, region, self.stride):  # the region is still connected
+            self.regions[i] = region
+            return
+
+        # flooding from each neighbour which has not been reached yet
+        split = []
+        while around:
+            self.floods += 1
+            part = flood(around & -around, region, self.stride)
+            split.append(part)
+            around &= ~part
+            region &= ~part
+        self.regions[i:i + 1] = split
+
+    def reachable(self, board: Board, player: int) -> int:
+        """Returns the free cells the player's bot can reach, without going through other bots."""
+        index = board.players[player]
+        if index == LOST:
+            return 0
+        around = neighbours(index, self.stride)
+        reached = 0
+        for region in self.regions:
+            if region & around:
+                reached |= region
+        return reached
+
+    def is_separated(self, board: Board, player: int) -> bool:
+        """Whether no other bot can reach any of the cells the player's bot can reach."""
+        reached = self.reachable(board, player)
+        return not any(
+            reached & neighbours(index, self.stride)
+            for other, index in enumerate(board.players) if other != player and index != LOST
+        )
@@ -0,0 +1,133 @@
+"""
+Caches shared by every box for loading fonts and rendering text
+"""
+from collections import OrderedDict
+from typing import Iterable
+import pygame
+
+
+font_key = tuple[str | None, int, bool, bool]  # (font name, size, bold, italic)
+# (text, font name, size, bold, italic, color)
+text_key = tuple[str, str | None, int, bool, bool, str | tuple]
+
+
+class FontCache:
+    """
+    A process-wide registry of loaded fonts. Looking up a font with `pygame.font.SysFont` searches the system fonts and
+    loads a file every time, so fonts are kept here and the least recently used one is dropped when the cache is full.
+    """
+
+    def __init__(self, max_size: int = 64) -> None:
+        """
+        :param max_size: the most fonts that will be kept loaded at once
+        """
+        if max_size <= 0:
+            raise ValueError('The size of the font cache must be a positive number')
+        self.max_size = max_size
+        self.hits = 0  # times a font was already loaded
+        self.misses = 0  # times a font needed to be loaded
+        self.__fonts: OrderedDict[font_key, pygame.font.Font] = OrderedDict()
+
+    def get(self, font: str | None, size: int, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+        """Returns the font, loading it if it is not already in the cache."""
+        key = (font, size, bold, italic)
+        if key in self.__fonts:
+            self.hits += 1
+            self.__fonts.move_to_end(key)  # most recently used fonts are at the end
+            return self.__fonts[key]
+
+        self.misses += 1
+        loaded_font = pygame.font.SysFont(font, size, bold=bold, italic=italic)
+        self.__fonts[key] = loaded_font
+        if len(self.__fonts) > self.max_size:
+            self.__fonts.popitem(last=False)  # evicting the least recently used font
+        return loaded_font
+
+    def warm_up(self, keys: Iterable[font_key]) -> None:
+        """Loads every font in `keys` ahead of time so that the first frames do not need to load them."""
+        for key in keys:
+            self.get(*key)
+
+    def clear(self) -> None:
+        """Unloads every font and resets the counters."""
+        self.__fonts.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def __len__(self) -> int:
+        return len(self.__fonts)
+
+    def __contains__(self, key: font_key) -> bool:
+        return key in self.__fonts
+
+
+class TextSurfaceCache:
+    """
+    A cache of rendered text which is shared by every box, so that the same text with the same properties is only
+    rendered once (for example "Play" buttons on different screens, or the text of a box after the window is resized).
+    The cache is limited by how many bytes the surfaces take up, dropping the least recently used surfaces first.
+
+    Note that the surfaces are shared, so they should be blitted but never drawn on.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024) -> None:
+        """
+        :param max_bytes: the most bytes that the cached surfaces can take up together
+        """
+        if max_bytes <= 0:
+            raise ValueError('The size of the text cache must be a positive number')
+        self.max_bytes = max_bytes
+        self.bytes_used = 0  # the bytes taken up by the cached surfaces
+        self.hits = 0  # times the text was already rendered
+        self.misses = 0  # times the text needed to be rendered
+        self.__surfaces: OrderedDict[text_key, pygame.surface.Surface] = OrderedDict()
+
+    def render(self, text: str, font: str | None, size: int, bold: bool, italic: bool, color: str | tuple) \
+            -> pygame.surface.Surface:
+        """Returns the rendered text, rendering it if it is not already in the cache."""
+        key = (text, font, size, bold, italic, color)
+        if key in self.__surfaces:
+            self.hits += 1
+            self.__surfaces.move_to_end(key)  # most recently used surfaces are at the end
+            return self.__surfaces[key]
+
+        self.misses += 1
+        surface = font_cache.get(font, size, bold, italic).render(text, True, color)
+        surface_bytes = self.surface_bytes(surface)
+        if surface_bytes > self.max_bytes:  # the surface would push everything else out, so it is not cached
+            return surface
+        self.__surfaces[key] = surface
+        self.bytes_used += surface_bytes
+        while self.bytes_used > self.max_bytes:  # evicting the least recently used surfaces
+            _, evicted = self.__surfaces.popitem(last=False)
+            self.bytes_used -= self.surface_bytes(evicted)
+        return surface
+
+    def clear(self) -> None:
+        """Removes every surface and resets the counters."""
+        self.__surfaces.clear()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def surface_bytes(surface: pygame.surface.Surface) -> int:
+        """The number of bytes that the pixels of a surface take up."""
+        return surface.get_pitch() * surface.get_height()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
+
+    def __len__(self) -> int:
+        return len(self.__surfaces)
+
+
+font_cache = FontCache()  # the font cache shared by every box
+text_cache = TextSurfaceCache()  # the rendered text shared by every box
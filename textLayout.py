@@ -0,0 +1,96 @@
+"""
+Functions for laying out text by measuring it instead of rendering it
+"""
+from itertools import accumulate
+from typing import Sequence
+from weakref import WeakKeyDictionary
+import pygame
+
+
+MAX_MEASUREMENTS = 4096  # the most measured widths that are remembered for each font
+
+# the widths of text which was already measured and the advance of each glyph, for every font
+# (fonts which are no longer loaded are removed)
+measured_widths: WeakKeyDictionary[pygame.font.Font, dict[str, int]] = WeakKeyDictionary()
+measured_advances: WeakKeyDictionary[pygame.font.Font, dict[str, int]] = WeakKeyDictionary()
+
+
+def text_width(font: pygame.font.Font, text: str) -> int:
+    """Returns the width that the text would have if it was rendered with the font."""
+    widths = measured_widths.setdefault(font, {})
+    if text not in widths:
+        if len(widths) >= MAX_MEASUREMENTS:
+            widths.clear()
+        widths[text] = font.size(text)[0]
+    return widths[text]
+
+
+def glyph_advances(font: pygame.font.Font, text: str) -> list[int]:
+    """Returns how far each character of the text moves the pen, which is used to estimate the width of the text."""
+    advances = measured_advances.setdefault(font, {})
+    missing = ''.join(set(text).difference(advances))
+    if missing:
+        for char, metrics in zip(missing, font.metrics(missing)):
+            advances[char] = metrics[4] if metrics is not None else 0
+    return [advances[char] for char in text]
+
+
+def fit_text(text: str, font: pygame.font.Font, available_width: int | float, char_wrap: bool = True) \
+        -> tuple[None | str, str]:
+    """
+    Finds the longest part of the text which fits within the available width, breaking the text at a space if
+    possible, or between characters if `char_wrap` is True.
+
+    :returns: the text that fits and the text left over, or None and the text if no part of it fits
+    """
+    # the places the text can be broken, from shortest to longest; spaces at the start of the text are not used
+    word_ends = [i for i, char in enumerate(text) if char == ' ' and i > 0]
+    word_ends.append(len(text))
+
+    def fits(end: int) -> bool:
+        return text_width(font, text[:end]) <= available_width
+
+    # the longest break at a space which fits
+    estimated_widths = list(accumulate(glyph_advances(font, text)))
+    i = largest_fitting(word_ends, fits, estimate(word_ends, estimated_widths, available_width))
+    if i != -1:
+        return text[:word_ends[i]], text[word_ends[i]:]
+    if not char_wrap:
+        return None, text
+
+    # the longest break between characters which fits, only shorter than the shortest word
+    char_ends = range(1, word_ends[0])
+    i = largest_fitting(char_ends, fits, estimate(char_ends, estimated_widths, available_width))
+    if i != -1:
+        return text[:char_ends[i]], text[char_ends[i]:]
+    return None, text
+
+
+def estimate(ends: Sequence[int], estimated_widths: list[int], available_width: int | float) -> int:
+    """Returns the index of the end which is expected to be the longest to fit, using the advances of the glyphs."""
+    low, high = 0, len(ends)
+    while low < high:
+        middle = (low + high) // 2
+        if ends[middle] == 0 or estimated_widths[ends[middle] - 1] <= available_width:
+            low = middle + 1
+        else:
+            high = middle
+    return low - 1
+
+
+def largest_fitting(ends: Sequence[int], fits, first_guess: int) -> int:
+    """
+    Binary searches for the index of the longest end which fits, starting at `first_guess`. The widths of text only
+    grow as the text gets longer, so every end before one that fits also fits.
+
+    :returns: the index of the longest end which fits, or -1 if none of them fit
+    """
+    low, high = -1, len(ends)  # `ends[low]` fits and `ends[high]` does not
+    guess = min(max(first_guess, 0), len(ends) - 1)
+    while high - low > 1:
+        if fits(ends[guess]):
+            low = guess
+        else:
+            high = guess
+        guess = (low + high) // 2
+    return low
@@ -0,0 +1,14 @@
+"""
+Summarising how long things took, shared by the frame statistics and the tournament runner
+"""
+from math import ceil
+from typing import Iterable
+
+
+def percentile(times: Iterable[float], percent: int | float) -> float:
+    """Returns the time which `percent` percent of the times are less than or equal to (nearest rank)."""
+    ordered = sorted(times)
+    if not ordered:
+        return 0.
+    rank = max(ceil(len(ordered) * percent / 100), 1)  # the smallest rank with `percent` percent of the times
+    return ordered[min(rank, len(ordered)) - 1]
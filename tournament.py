@@ -0,0 +1,231 @@
+"""
+Plays many games between bots without any display, to compare bots and to measure how fast the game and bots are
+
+Example:
+    python tournament.py --games 200 --width 8 --height 8 --bots alphabeta mcts --processes 4 --json results.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+from random import Random
+from time import perf_counter
+from boardClass import Board
+from gameRecord import GameWriter
+from mctsBotClass import MCTSBot
+from searchBotClass import SearchBot
+from timings import percentile
+
+
+BOT_TYPES = ('alphabeta', 'mcts', 'random')
+PERCENTILES = (50, 95, 99)  # the percentiles of the time each turn took that are reported
+
+
+class RandomBot:
+    """Takes random turns, a baseline for the other bots."""
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.random = Random(seed)
+
+    def choose_start(self, board: Board, num_players: int | None = None) -> tuple[int, int]:
+        free = [(x, y) for y in range(board.height) for x in range(board.width) if board.is_free((x, y))]
+        return self.random.choice(free)
+
+    def choose_action(self, board: Board, player: int) -> int | None:
+        actions = board.actions(player)
+        return self.random.choice(actions) if actions else None
+
+
+def make_bot(bot_type: str, time_limit: float | None, playouts: int | None,
+             seed: int) -> SearchBot | MCTSBot | RandomBot:
+    if bot_type == 'alphabeta':
+        return SearchBot(time_limit or .05)
+    if bot_type == 'mcts':
+        return MCTSBot(time_limit if playouts is None else None, playouts, seed=seed)
+    if bot_type == 'random':
+        return RandomBot(seed)
+    raise ValueError(f'Unknown bot "{bot_type}", the bots are {", ".join(BOT_TYPES)}')
+
+
+def play_game(width: int, height: int, bot_types: list[str], time_limit: float | None, playouts: int | None,
+              seed: int) -> dict:
+    """
+    Plays one game, the bots take their turns in the order they are given.
+
+    :return: the winner (the index in `bot_types`), the number of turns, how long each bot's turns took, and where the
+             bots were placed and the turns taken for `GameWriter`
+    """
+    bots = [make_bot(bot_type, time_limit, playouts, seed + i) for i, bot_type in enumerate(bot_types)]
+    board = Board(width, height)
+    for bot in bots:
+        board.add_player(bot.choose_start(board, len(bots)))
+    starts = board.player_positions
+
+    latencies: list[list[float]] = [[] for _ in bots]
+    actions = []
+    player = 0
+    while board.players_left > 1:
+        start = perf_counter()
+        action = bots[player].choose_action(board, player)
+        latencies[player].append(perf_counter() - start)
+        if action is None:
+            board.remove_player(player)
+        else:
+            board.play(player, action)
+            actions.append(action)
+        player = board.next_player(player)
+    return {'winner': board.next_player(player), 'turns': len(actions), 'latencies': latencies, 'starts': starts,
+            'actions': actions}
+
+
+def play_seated_game(args: tuple[int, int, list[str], float | None, int | None, int, int]) -> dict:
+    """
+    Plays game number `game` with the seats rotated by the game number, so that every bot moves first equally often.
+
+    :return: the result of `play_game`, with the winner and latencies given for the bots in their original order, the
+             starts are still in the order the bots were placed
+    """
+    width, height, bot_types, time_limit, playouts, seed, game = args
+    shift = game % len(bot_types)
+    seats = list(range(len(bot_types)))[shift:] + list(range(len(bot_types)))[:shift]  # the bot in each seat
+    result = play_game(width, height, [bot_types[bot] for bot in seats], time_limit, playouts, seed + game * 1000)
+    latencies = [[] for _ in bot_types]
+    for seat, bot in enumerate(seats):
+        latencies[bot] = result['latencies'][seat]
+    return {'winner': seats[result['winner']], 'turns': result['turns'], 'latencies': latencies,
+            'starts': result['starts'], 'actions': result['actions']}
+
+
+def wilson_interval(wins: int, games: int, z: float = 1.96) -> tuple[float, float]:
+    """Returns the Wilson score interval of a win rate, by default the 95% interval."""
+    if not games:
+        return 0., 1.
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    margin = z * sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(center - margin, 0.), min(center + margin, 1.)
+
+
+def keep_game(result: dict, width: int, height: int, writer: GameWriter | None) -> dict:
+    """Writes a game's turns to the record, then drops them from the result so that they are not kept in memory."""
+    starts, actions = result.pop('starts'), result.pop('actions')
+    if writer is not None:
+        board = Board(width, height)
+        for pos in starts:
+            board.add_player(pos)
+        writer.write_game(board, actions)
+    return result
+
+
+def current_commit() -> str | None:
+    """Returns the git commit of the code being run, so that results can be compared between commits."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run(games: int, width: int, height: int, bot_types: list[str], time_limit: float | None = .05,
+        playouts: int | None = None, processes: int = 1, seed: int = 0, record: str | None = None) -> dict:
+    """
+    Plays the games, in several processes if `processes` is more than 1.
+
+    :param record: the file to append the games to (see `GameWriter`), None to not keep them
+
+    :return: the results, which can be written as JSON
+    """
+    if games <= 0 or processes <= 0:
+        raise ValueError('The number of games and processes must be positive')
+    if len(bot_types) < 2:
+        raise ValueError('At least two bots are needed')
+    if width * height < len(bot_types):
+        raise ValueError('The board is too small for every bot')
+    for bot_type in bot_types:
+        if bot_type not in BOT_TYPES:
+            raise ValueError(f'Unknown bot "{bot_type}", the bots are {", ".join(BOT_TYPES)}')
+
+    jobs = [(width, height, bot_types, time_limit, playouts, seed, game) for game in range(games)]
+    start = perf_counter()
+    writer = GameWriter(record) if record is not None else None
+    results = []
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            for result in executor.map(play_seated_game, jobs, chunksize=max(games // (processes * 4), 1)):
+                results.append(keep_game(result, width, height, writer))
+    else:
+        for job in jobs:
+            results.append(keep_game(play_seated_game(job), width, height, writer))
+    if writer is not None:
+        writer.close()
+    seconds = perf_counter() - start
+
+    turns = sum(result['turns'] for result in results)
+    bots = []
+    for i, bot_type in enumerate(bot_types):
+        wins = sum(result['winner'] == i for result in results)
+        low, high = wilson_interval(wins, games)
+        latencies = [latency * 1000 for result in results for latency in result['latencies'][i]]
+        bots.append({
+            'bot': bot_type,
+            'seat': i + 1,
+            'wins': wins,
+            'win_rate': wins / games,
+            'win_rate_95': [low, high],
+            'turns': len(latencies),
+            'latency_ms': {f'p{percent}': percentile(latencies, percent) for percent in PERCENTILES},
+        })
+    return {
+        'commit': current_commit(),
+        'python': sys.version.split()[0],
+        'settings': {'games': games, 'width': width, 'height': height, 'bots': bot_types, 'time_limit': time_limit,
+                     'playouts': playouts, 'processes': processes, 'seed': seed},
+        'seconds': seconds,
+        'games_per_second': games / seconds,
+        'moves_per_second': turns / seconds,
+        'bots': bots,
+    }
+
+
+def print_results(results: dict) -> None:
+    print(f'{results["settings"]["games"]} games in {results["seconds"]:.2f}s: '
+          f'{results["games_per_second"]:.2f} games/s, {results["moves_per_second"]:.1f} moves/s')
+    for bot in results['bots']:
+        low, high = bot['win_rate_95']
+        latency = ' '.join(f'{name} {time:.2f}' for name, time in bot['latency_ms'].items())
+        print(f'  {bot["seat"]}. {bot["bot"]:<10} won {bot["wins"]} ({bot["win_rate"]:.1%}, 95% {low:.1%}-{high:.1%})'
+              f' | turn {latency} ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Plays games between bots without a display.')
+    parser.add_argument('--games', type=int, default=100, help='how many games to play')
+    parser.add_argument('--width', type=int, default=8, help='the width of the board')
+    parser.add_argument('--height', type=int, default=8, help='the height of the board')
+    parser.add_argument('--bots', nargs='+', default=['alphabeta', 'mcts'], choices=BOT_TYPES,
+                        help='the bots playing, a bot can be given more than once')
+    parser.add_argument('--time-limit', type=float, default=.05, help='seconds each bot can think for each turn')
+    parser.add_argument('--playouts', type=int, default=None,
+                        help='random games the MCTS bots play each turn instead of using the time limit')
+    parser.add_argument('--processes', type=int, default=1, help='how many games are played at once')
+    parser.add_argument('--seed', type=int, default=0, help='the seed for the bots')
+    parser.add_argument('--json', metavar='PATH', help='where to write the results as JSON')
+    parser.add_argument('--record', metavar='PATH', help='the file to append the games to, see gameRecord.py')
+    args = parser.parse_args()
+
+    try:
+        results = run(args.games, args.width, args.height, args.bots, args.time_limit, args.playouts, args.processes,
+                      args.seed, args.record)
+    except ValueError as e:
+        parser.error(str(e))
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
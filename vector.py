@@ -1,49 +1,61 @@
+from operator import itemgetter
 from typing import Union
 
 
 vector2d_like = Union['Vector2d', list[int | float, int | float], tuple[int | float, int | float]]
+INTERNED = range(-8, 33)  # the coordinates of the vectors which are made once and shared, such as positions and offsets
 
 
-class Vector2d:
-    def __init__(self, x: int | float, y: int | float):
-        self.x = x
-        self.y = y
+class Vector2d(tuple):
+    """
+    An immutable (x, y) which is equal to, and hashes the same as, the tuple (x, y), so it can be used in sets, as a
+    key, and with `in`. Vectors with small integer coordinates are made once and shared, so making them again does not
+    allocate.
+    """
+    __slots__ = ()
+
+    x = property(itemgetter(0))
+    y = property(itemgetter(1))
+
+    def __new__(cls, x: int | float, y: int | float) -> 'Vector2d':
+        if type(x) is int and type(y) is int and x in INTERNED and y in INTERNED and cls is Vector2d:
+            return _interned[x - INTERNED.start][y - INTERNED.start]
+        return tuple.__new__(cls, (x, y))
+
+    def __getnewargs__(self) -> tuple[int | float, int | float]:
+        return tuple(self)
+
+    def __repr__(self) -> str:
+        return f'Vector2d({self[0]!r}, {self[1]!r})'
 
     @property
     def normalized(self):
-        return Vector2d(self.x / self.magnitude, self.y / self.magnitude)
+        return Vector2d(self[0] / self.magnitude, self[1] / self.magnitude)
 
     @property
     def magnitude(self):
-        return (self.x ** 2 + self.y ** 2) ** .5
+        return (self[0] ** 2 + self[1] ** 2) ** .5
 
     def __add__(self, other: vector2d_like) -> 'Vector2d':
-        if isinstance(other, Vector2d):
-            return Vector2d(self.x + other.x, self.y + other.y)
-        else:
-            return Vector2d(self.x + other[0], self.y + other[1])
+        return Vector2d(self[0] + other[0], self[1] + other[1])
 
-    def __iadd__(self, other: vector2d_like) -> 'Vector2d':
-        return self + other
+    def __radd__(self, other: vector2d_like) -> 'Vector2d':
+        return Vector2d(other[0] + self[0], other[1] + self[1])
 
-    def __mul__(self, other: int | float):
-        return Vector2d(self.x*other, self.y *other)
+    def __mul__(self, other: int | float) -> 'Vector2d':
+        return Vector2d(self[0] * other, self[1] * other)
 
-    def __imul__(self, other: int | float):
+    def __rmul__(self, other: int | float) -> 'Vector2d':
         return self * other
 
-    def __neg__(self):
-        return self * -1
+    def __neg__(self) -> 'Vector2d':
+        return Vector2d(-self[0], -self[1])
 
-    def __sub__(self, other: vector2d_like):
-        return self + other * -1
+    def __sub__(self, other: vector2d_like) -> 'Vector2d':
+        return Vector2d(self[0] - other[0], self[1] - other[1])
 
-    def __isub__(self, other: vector2d_like):
-        return self - other
+    def __rsub__(self, other: vector2d_like) -> 'Vector2d':
+        return Vector2d(other[0] - self[0], other[1] - self[1])
 
-    def __len__(self):
-        return 2
 
-    def __iter__(self):
-        yield self.x
-        yield self.y
+_interned = [[tuple.__new__(Vector2d, (x, y)) for y in INTERNED] for x in INTERNED]
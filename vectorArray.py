@@ -0,0 +1,101 @@
+"""
+Many (x, y) positions stored in one NumPy array, so that adding to, comparing, and searching all of them is done at once
+"""
+from typing import Iterable, Iterator
+import numpy as np
+from boardClass import Board
+from vector import Vector2d, vector2d_like
+
+
+class VectorArray:
+    """
+    Positions such as the tiles or bots of a board, stored as rows of a (length, 2) array of 32 bit integers, which is
+    8 bytes for each position rather than a `Vector2d` for each. Positions can be appended, room for more is made by
+    doubling the array so that appending does not copy it every time.
+    """
+
+    def __init__(self, vectors: Iterable[vector2d_like] | np.ndarray = ()) -> None:
+        data = np.array(vectors if isinstance(vectors, np.ndarray) else list(vectors), dtype=np.int32).reshape(-1, 2)
+        self.__data = data
+        self.__length = len(data)
+
+    @classmethod
+    def from_cells(cls, board: Board, cells: int) -> 'VectorArray':
+        """Creates the positions of the cells set in a bitboard of the board, such as `Board.tiles`."""
+        bits = np.unpackbits(np.frombuffer(cells.to_bytes((board.size + 7) // 8, 'little'), dtype=np.uint8),
+                             bitorder='little')
+        y, x = np.divmod(np.flatnonzero(bits), board.stride)
+        return cls(np.stack([x - 1, y - 1], axis=1))
+
+    @property
+    def array(self) -> np.ndarray:
+        """The positions as a (length, 2) array, which shares its memory with this."""
+        return self.__data[:self.__length]
+
+    @property
+    def nbytes(self) -> int:
+        return self.__data.nbytes
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __iter__(self) -> Iterator[Vector2d]:
+        for x, y in self.array.tolist():
+            yield Vector2d(x, y)
+
+    def __getitem__(self, index: int | slice | np.ndarray) -> 'Vector2d | VectorArray':
+        """Returns one position, or the positions of a slice, a list of indices, or a mask from `==`."""
+        if isinstance(index, int):
+            x, y = self.array[index].tolist()
+            return Vector2d(x, y)
+        return VectorArray(self.array[index])
+
+    def __repr__(self) -> str:
+        return f'VectorArray({self.array.tolist()})'
+
+    def append(self, vector: vector2d_like) -> None:
+        if self.__length == len(self.__data):
+            data = np.empty((max(2 * self.__length, 8), 2), dtype=np.int32)
+            data[:self.__length] = self.array
+            self.__data = data
+        self.__data[self.__length] = vector
+        self.__length += 1
+
+    def extend(self, vectors: Iterable[vector2d_like]) -> None:
+        for vector in vectors:
+            self.append(vector)
+
+    def __add__(self, other: 'vector2d_like | VectorArray') -> 'VectorArray':
+        """Adds a vector to every position, or adds the positions of an array of the same length."""
+        return VectorArray(self.array + (other.array if isinstance(other, VectorArray) else np.asarray(other)))
+
+    def __sub__(self, other: 'vector2d_like | VectorArray') -> 'VectorArray':
+        return VectorArray(self.array - (other.array if isinstance(other, VectorArray) else np.asarray(other)))
+
+    def __neg__(self) -> 'VectorArray':
+        return VectorArray(-self.array)
+
+    def __eq__(self, other: 'vector2d_like | VectorArray') -> np.ndarray:
+        """Returns a mask of the positions equal to a vector, or to the positions of an array of the same length."""
+        return (self.array == (other.array if isinstance(other, VectorArray) else np.asarray(other))).all(axis=1)
+
+    __hash__ = None  # the positions can change, and `==` returns a mask
+
+    def __contains__(self, vector: vector2d_like) -> bool:
+        return bool((self == vector).any())
+
+    def keys(self) -> np.ndarray:
+        """Returns each position packed into one 64 bit integer, equal positions have equal keys."""
+        array = self.array.astype(np.int64)
+        return array[:, 0] << 32 | array[:, 1] & 0xFFFFFFFF
+
+    def contains(self, vectors: 'Iterable[vector2d_like] | VectorArray') -> np.ndarray:
+        """Returns a mask of which of the vectors are positions of this array."""
+        if not isinstance(vectors, VectorArray):
+            vectors = VectorArray(vectors)
+        return np.isin(vectors.keys(), self.keys())
+
+    def in_bounds(self, width: int, height: int) -> np.ndarray:
+        """Returns a mask of the positions on a board of the size."""
+        x, y = self.array[:, 0], self.array[:, 1]
+        return (0 <= x) & (x < width) & (0 <= y) & (y < height)